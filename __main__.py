@@ -1,4 +1,41 @@
-from mugen import Mugen
+import argparse
+import contextlib
+import importlib
+import pathlib
+import time
 
-if __name__ == "__main__":
+# imported one by one ahead of the game so the startup trace shows what each costs, the game package last
+IMPORTS = ("pygame", "moderngl", "numba", "mugen")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(prog="mugen")
+    parser.add_argument("--warmup", action="store_true", help="compile every kernel into the persistent cache and exit")
+    parser.add_argument(
+        "--trace", type=pathlib.Path, metavar="PATH", help="write a chrome trace of startup up to the first frame"
+    )
+    args = parser.parse_args()
+
+    imports = []
+    for name in IMPORTS:
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(None):
+            importlib.import_module(name)
+        imports.append((f"import {name}", start, time.perf_counter()))
+
+    from mugen import Mugen
+    from mugen.core import warmup
+    from mugen.utils import tracer
+
+    if args.warmup:
+        warmup(Mugen._logger)
+        return
+    if args.trace is not None:
+        tracer.start(args.trace, origin=imports[0][1])
+        for span in imports:
+            tracer.record(*span)
     Mugen().run()
+
+
+if __name__ == "__main__":
+    main()
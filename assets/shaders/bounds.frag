@@ -0,0 +1,8 @@
+#version 330 core
+
+layout (location = 0) out vec4 fragColor;
+
+void main() {
+    // the color mask is off while bounds are drawn, only the samples passing the depth test count
+    fragColor = vec4(0.0);
+}
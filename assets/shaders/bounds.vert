@@ -0,0 +1,24 @@
+#version 330 core
+
+// camera and world constants every program shares, written once per frame
+layout (std140) uniform Camera {
+    mat4 uProjection;
+    mat4 uView;
+    vec3 bgColor;
+    float uTime;
+    float waterLine;
+    int waterArea;
+    int center;
+    float cloudScale;
+};
+
+uniform vec3 uOrigin;
+uniform float uSize;
+
+
+void main() {
+    // corner i of a cube drawn as a triangle strip of 14 vertices, no vertex buffer needed
+    uint corner = 1u << gl_VertexID;
+    vec3 position = vec3((0x287au & corner) != 0u, (0x02afu & corner) != 0u, (0x31e3u & corner) != 0u);
+    gl_Position = uProjection * uView * vec4(uOrigin + position * uSize, 1.0);
+}
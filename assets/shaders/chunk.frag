@@ -6,8 +6,18 @@ const vec3 gamma = vec3(2.2);
 const vec3 invGamma = vec3(1.0 / 2.2);
 
 uniform sampler2DArray uTexture;
-uniform vec3 bgColor;
-uniform float waterLine;
+
+// camera and world constants every program shares, written once per frame
+layout (std140) uniform Camera {
+    mat4 uProjection;
+    mat4 uView;
+    vec3 bgColor;
+    float uTime;
+    float waterLine;
+    int waterArea;
+    int center;
+    float cloudScale;
+};
 
 in vec3 voxel_color;
 in vec2 voxel_uv;
@@ -16,9 +26,11 @@ in vec3 frag_world_pos;
 flat in int voxel_id, face_id;
 
 void main() {
-    vec2 face_uv = voxel_uv;
-    face_uv.x = voxel_uv.x / 3.0 - min(face_id, 2) / 3.0;
-    vec3 texColor = texture(uTexture, vec3(face_uv, voxel_id)).rgb;
+    // textures repeat along v on their own, u has to stay inside the column of the face in the texture atlas
+    vec2 face_uv = vec2(fract(voxel_uv.x) / 3.0 - min(face_id, 2) / 3.0, voxel_uv.y);
+    // gradients of the continuous uvs, the jump of fract at voxel edges would select the coarsest mip level
+    vec2 scale = vec2(1.0 / 3.0, 1.0);
+    vec3 texColor = textureGrad(uTexture, vec3(face_uv, voxel_id), dFdx(voxel_uv) * scale, dFdy(voxel_uv) * scale).rgb;
     texColor = pow(texColor, gamma);
     texColor *= shade;
     // underwater effect
@@ -1,12 +1,25 @@
-#version 330 core
+#version 430 core
 
-layout (location = 0) in uint packed_data;
+// faces of every chunk as records of 2 words, vertex i of a draw is corner i % 4 of face i / 4
+layout (std430, binding = 0) readonly buffer Faces {
+    uint faces[];
+};
+// per instance, the base instance of every indirect draw selects the origin of its chunk
+layout (location = 0) in vec3 chunk_origin;
 
-int x, y, z, ao_id, flip_id;
+int x, y, z, ao_id;
 
-uniform mat4 uProjection;
-uniform mat4 uView;
-uniform mat4 uModel;
+// camera and world constants every program shares, written once per frame
+layout (std140) uniform Camera {
+    mat4 uProjection;
+    mat4 uView;
+    vec3 bgColor;
+    float uTime;
+    float waterLine;
+    int waterArea;
+    int center;
+    float cloudScale;
+};
 
 out vec3 voxel_color;
 out vec2 voxel_uv;
@@ -17,20 +30,33 @@ flat out int voxel_id, face_id;
 const float ao_shades[4] = float[](
     0.7, 0.8, 0.9, 1.0
 );
-const vec2 uv_coords[4] = vec2[](
-    vec2(0, 0), vec2(0, 1), vec2(1, 0), vec2(1, 1)
-);
-const int uv_indices[24] = int[](
-    1, 0, 2, 1, 2, 3,
-    3, 0, 2, 3, 1, 0,
-    3, 1, 0, 3, 0, 2,
-    1, 2, 3, 1, 0, 2
-);
 const float shading[6] = float[](
     // top bottom right left back front
     0.8, 0.5, 0.6, 0.6, 0.5, 0.7
 );
 
+// the tables the mesher builds faces with, see mesh_builder.py
+// corners of every face in triangle order, unflipped and flipped along the other diagonal
+const int face_quads[48] = int[](
+    0, 3, 2, 1, 1, 0, 3, 2,
+    2, 3, 0, 1, 3, 0, 1, 2,
+    0, 1, 2, 3, 3, 0, 1, 2,
+    2, 1, 0, 3, 1, 0, 3, 2,
+    0, 1, 2, 3, 3, 0, 1, 2,
+    2, 1, 0, 3, 1, 0, 3, 2
+);
+// offsets of the corners v0..v3 along the two axes spanning faces along y and x, and along z
+const ivec2 face_corners[8] = ivec2[](
+    ivec2(0, 0), ivec2(1, 0), ivec2(1, 1), ivec2(0, 1),
+    ivec2(0, 0), ivec2(0, 1), ivec2(1, 1), ivec2(1, 0)
+);
+// the two axes spanning faces along y, x and z
+const ivec3 face_axes[6] = ivec3[](
+    ivec3(1, 0, 0), ivec3(0, 0, 1),
+    ivec3(0, 1, 0), ivec3(0, 0, 1),
+    ivec3(1, 0, 0), ivec3(0, 1, 0)
+);
+
 vec3 colorHash(float idx) {
     // vibrant colors
     float r = fract(sin(idx * 12.9898) * 43758.5453);
@@ -39,24 +65,34 @@ vec3 colorHash(float idx) {
     return vec3(r, g, b);
 }
 
-void unpack(uint packed_data) {
-    // x: 6 bits, y: 6 bits, z: 6 bits, voxel_id: 8 bits, face_id: 3 bits, ao: 2 bits, flip: 1 bit
-    x = int(packed_data >> 26) & 0x3F;
-    y = int(packed_data >> 20) & 0x3F;
-    z = int(packed_data >> 14) & 0x3F;
-    voxel_id = int(packed_data >> 6) & 0xFF;
-    face_id = int(packed_data >> 3) & 0x7;
-    ao_id = int(packed_data >> 1) & 0x3;
-    flip_id = int(packed_data) & 0x1;
+void unpack(uint head, uint size, int vertex) {
+    // x: 6 bits, y: 6 bits, z: 6 bits, voxel_id: 8 bits, face_id: 3 bits
+    // w: 6 bits, h: 6 bits, flip: 1 bit, ao of the corners v0..v3: 2 bits each
+    voxel_id = int(head >> 6) & 0xFF;
+    face_id = int(head >> 3) & 0x7;
+    int w = int(size >> 26) & 0x3F;
+    int h = int(size >> 20) & 0x3F;
+    int flip_id = int(size >> 8) & 0x1;
+    int corner = face_quads[face_id * 8 + flip_id * 4 + vertex];
+    ivec2 offset = face_corners[(face_id >> 2) * 4 + corner] * ivec2(w, h);
+    int axes = face_id >> 1;
+    ivec3 position = ivec3(head >> 26, head >> 20, head >> 14) & 0x3F;
+    position += face_axes[axes * 2] * offset.x + face_axes[axes * 2 + 1] * offset.y;
+    x = position.x;
+    y = position.y;
+    z = position.z;
+    ao_id = int(size >> (6 - 2 * corner)) & 0x3;
 }
 
 void main() {
-    unpack(packed_data);
+    int face = gl_VertexID >> 2;
+    unpack(faces[face * 2], faces[face * 2 + 1], gl_VertexID & 3);
     vec3 in_position = vec3(x, y, z);
     voxel_color = colorHash(float(voxel_id));
-    int uv_idx = gl_VertexID % 6 + ((face_id & 1) + flip_id * 2) * 6;
-    voxel_uv = uv_coords[uv_indices[uv_idx]];
+    // uvs follow the position so textures repeat once per voxel across the merged quads of the greedy mesher
+    voxel_uv = face_id < 2 ? in_position.xz : face_id < 4 ? in_position.zy : in_position.xy;
+    voxel_uv = vec2((face_id & 1) == 1 ? -voxel_uv.x : voxel_uv.x, -voxel_uv.y);
     shade = shading[face_id] * ao_shades[ao_id];
-    frag_world_pos = (uModel * vec4(in_position, 1.0)).xyz;
-    gl_Position = uProjection * uView * uModel * vec4(in_position, 1.0);
+    frag_world_pos = chunk_origin + in_position;
+    gl_Position = uProjection * uView * vec4(frag_world_pos, 1.0);
 }
@@ -4,7 +4,17 @@ layout (location = 0) out vec4 fragColor;
 
 const vec3 cloud_color = vec3(1);
 
-uniform vec3 bgColor;
+// camera and world constants every program shares, written once per frame
+layout (std140) uniform Camera {
+    mat4 uProjection;
+    mat4 uView;
+    vec3 bgColor;
+    float uTime;
+    float waterLine;
+    int waterArea;
+    int center;
+    float cloudScale;
+};
 
 void main() {
     float fog_dist = gl_FragCoord.z / gl_FragCoord.w;
@@ -2,11 +2,17 @@
 
 layout (location = 0) in vec3 in_position;
 
-uniform mat4 uProjection;
-uniform mat4 uView;
-uniform int center;
-uniform float uTime;
-uniform float cloudScale;
+// camera and world constants every program shares, written once per frame
+layout (std140) uniform Camera {
+    mat4 uProjection;
+    mat4 uView;
+    vec3 bgColor;
+    float uTime;
+    float waterLine;
+    int waterArea;
+    int center;
+    float cloudScale;
+};
 
 void main() {
     vec3 pos = vec3(in_position);
@@ -3,8 +3,18 @@
 layout (location = 0) in vec2 tex_coord;
 layout (location = 1) in vec3 in_position;
 
-uniform mat4 uProjection;
-uniform mat4 uView;
+// camera and world constants every program shares, written once per frame
+layout (std140) uniform Camera {
+    mat4 uProjection;
+    mat4 uView;
+    vec3 bgColor;
+    float uTime;
+    float waterLine;
+    int waterArea;
+    int center;
+    float cloudScale;
+};
+
 uniform mat4 uModel;
 uniform uint uMode;
 
@@ -8,7 +8,18 @@ const vec3 inv_gamma = 1 / gamma;
 in vec2 uv;
 
 uniform sampler2D uTexture;
-uniform float waterLine;
+
+// camera and world constants every program shares, written once per frame
+layout (std140) uniform Camera {
+    mat4 uProjection;
+    mat4 uView;
+    vec3 bgColor;
+    float uTime;
+    float waterLine;
+    int waterArea;
+    int center;
+    float cloudScale;
+};
 
 
 void main() {
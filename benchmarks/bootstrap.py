@@ -0,0 +1,43 @@
+import pathlib
+import tempfile
+
+import numpy as np
+from mugen.components import World
+from mugen.utils import WORLD, RegionStore
+
+from .headless import HeadlessApp, timed
+
+
+def main() -> None:
+    app = HeadlessApp()
+    directory = tempfile.TemporaryDirectory()
+    worlds: dict[int, World] = {}
+
+    def build(workers: int) -> None:
+        # an empty store every time, so every chunk is generated
+        store = RegionStore(pathlib.Path(tempfile.mkdtemp(dir=directory.name)))
+        worlds[workers] = World(app, workers=workers, store=store)  # type: ignore
+
+    # first build pays for JIT compilation
+    build(1)
+    serial = timed(lambda: build(1))
+    parallel = timed(lambda: build(WORLD.WORKERS))
+    print(f"serial bootstrap:   {serial:.3f}s")
+    print(f"parallel bootstrap: {parallel:.3f}s ({WORLD.WORKERS} workers, {serial / parallel:.2f}x)")
+
+    a, b = worlds[1], worlds[WORLD.WORKERS]
+    assert np.array_equal(a.storage.arrays.modes, b.storage.arrays.modes), "storage modes differ"
+    for x, y in zip(a.chunks, b.chunks):
+        assert x is not None and y is not None
+        assert x.is_built == y.is_built and (x.mesh is None) == (y.mesh is None)
+        if x.is_built:
+            voxels = a.storage.decode(x.index), b.storage.decode(y.index)
+            assert np.array_equal(*voxels), f"voxels of chunk {x.position} differ"
+        if x.mesh is not None and y.mesh is not None:
+            assert np.array_equal(x.mesh.vertices, y.mesh.vertices), f"mesh of chunk {x.position} differs"
+    print("serial and parallel output are identical")
+    directory.cleanup()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+import pathlib
+import tempfile
+import time
+import typing as t
+
+import glm
+import moderngl
+from mugen.components import World
+from mugen.utils import CHUNK, SHADERS, RegionStore
+
+from .headless import HeadlessApp, is_visible
+
+FRAMES = 50
+
+
+def timed_frames(app: HeadlessApp, draw: t.Callable[[], None]) -> float:
+    app.ctx.finish()
+    start = time.perf_counter()
+    for _ in range(FRAMES):
+        draw()
+    app.ctx.finish()
+    return (time.perf_counter() - start) / FRAMES
+
+
+def main() -> None:
+    app = HeadlessApp()
+    with tempfile.TemporaryDirectory() as directory:
+        world = World(app, store=RegionStore(pathlib.Path(directory)))  # type: ignore
+        while world.pipeline.pending:
+            world.render()
+            world.pipeline.finish()
+        # a few pixels, so the rasterizer stays out of the way of draw submission
+        app.ctx.simple_framebuffer((16, 16)).use()
+
+        # the chunk shader as it was before the arena, the origin of every chunk set as a uniform before its draw
+        vertex_shader = SHADERS.CHUNK_VERT.read_text().replace(
+            "layout (location = 0) in vec3 chunk_origin;", "uniform vec3 chunk_origin;"
+        )
+        program = app.shader.bind(
+            app.ctx.program(vertex_shader=vertex_shader, fragment_shader=SHADERS.CHUNK_FRAG.read_text())
+        )
+        vbos: dict[int, moderngl.Buffer] = {}
+        vaos: dict[int, moderngl.VertexArray] = {}
+        counts = {}
+        for chunk in world.chunks:
+            if chunk is not None and chunk.mesh is not None and chunk.mesh.vao is not None:
+                vbos[chunk.index] = app.ctx.buffer(chunk.mesh.vertices)
+                vaos[chunk.index] = app.ctx.vertex_array(
+                    program, [], index_buffer=world.index_buffer, index_element_size=4
+                )
+                counts[chunk.index] = chunk.mesh.command[0]
+
+        def trim(quads: int | None) -> None:
+            # draws of every chunk cut down to their first quads, so the vertex work of the software rasterizer
+            # stops hiding what submitting the draws costs
+            for chunk in world.chunks:
+                if chunk is not None and chunk.index in counts:
+                    count = counts[chunk.index] if quads is None else min(quads * 6, counts[chunk.index])
+                    vaos[chunk.index].vertices = count
+                    chunk.mesh.command[0] = count  # type: ignore
+
+        def draw_each() -> None:
+            # `World.render` as it was, one uniform write and draw per visible chunk
+            world.pipeline.upload()
+            for chunk in world.chunks:
+                if chunk is None:
+                    continue
+                if chunk.mesh is None:
+                    if chunk.is_on_frustum(chunk):
+                        world.pipeline.request(chunk)
+                elif is_visible(chunk):
+                    program["chunk_origin"].write(glm.vec3(chunk.position) * CHUNK.SIZE)  # type: ignore
+                    vbos[chunk.index].bind_to_storage_buffer(0)
+                    vaos[chunk.index].render()
+
+        visible = sum(chunk is not None and is_visible(chunk) for chunk in world.chunks)
+        print(f"{visible} visible chunks, ms per frame")
+        for label, quads in (("whole meshes", None), ("one quad each", 1)):
+            trim(quads)
+            each, indirect = (timed_frames(app, draw) for draw in (draw_each, world.render))
+            print(
+                f"{label:>14}: {each * 1000:>6.2f} with {visible} draws and uniform writes, "
+                f"{indirect * 1000:>6.2f} with one indirect draw"
+            )
+        world.close()
+
+
+if __name__ == "__main__":
+    main()
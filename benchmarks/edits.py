@@ -0,0 +1,67 @@
+import pathlib
+import tempfile
+
+import glm
+from mugen.components import World
+from mugen.components.chunk import Chunk
+from mugen.utils import CHUNK, RegionStore
+
+from .headless import HeadlessApp, timed
+
+REPEAT = 20
+
+
+def find_border_voxel(world: World) -> tuple[Chunk, glm.ivec3] | None:
+    # a surface voxel on the -x face of a meshed chunk away from its section borders, so an edit reaches into one
+    # neighbouring chunk and a single section of each, busiest chunks first
+    meshed = [chunk for chunk in world.chunks if chunk is not None and chunk.mesh is not None]
+    for chunk in sorted(meshed, key=lambda chunk: -len(chunk.mesh.vertices)):  # type: ignore
+        origin = glm.ivec3(chunk.position) * CHUNK.SIZE + glm.ivec3(0, 0, CHUNK.SIZE // 2)
+        for y in range(CHUNK.SIZE):
+            if y % CHUNK.SECTION_HEIGHT in (0, CHUNK.SECTION_HEIGHT - 1):
+                continue
+            column = (origin + glm.ivec3(0, y + dy, 0) for dy in (-1, 0, 1))
+            below, voxel, above = (world.chunk_manager.get_voxel_id(position)[0] for position in column)
+            if below and voxel and not above:
+                return chunk, origin + glm.ivec3(0, y, 0)
+    return None
+
+
+def main() -> None:
+    app = HeadlessApp()
+    # every edit logs a line, which would cost more than the meshing being measured
+    app.logger.disabled = True
+    with tempfile.TemporaryDirectory() as directory:
+        world = World(app, store=RegionStore(pathlib.Path(directory)))  # type: ignore
+        manager = world.chunk_manager
+        site = find_border_voxel(world)
+        assert site is not None, "no surface voxel on a chunk border"
+        chunk, position = site
+        x, y, z = chunk.position
+        # chunks the whole chunk rebuild remeshed, the edited one and the one across its -x face
+        meshes = [c.mesh for c in (chunk, world.get_chunk((x - 1, y, z))) if c is not None and c.mesh is not None]
+
+        def edit() -> None:
+            # removes the voxel and puts it back on top of the one below it
+            manager.voxel_id, manager.voxel_world_pos, manager.chunk = 1, position, chunk
+            manager.voxel_index = manager.get_voxel_id(position)[1]
+            manager.remove_voxel()
+            manager.voxel_world_pos, manager.voxel_normal = position - glm.ivec3(0, 1, 0), glm.ivec3(0, 1, 0)
+            manager.add_voxel()
+
+        def rebuild() -> None:
+            for _ in range(2):
+                for mesh in meshes:
+                    mesh._rebuild()
+
+        edit()
+        sections = timed(edit, repeat=REPEAT) / 2
+        whole = timed(rebuild, repeat=REPEAT) / 2
+        print(f"edit at {tuple(position)} touching {len(meshes)} chunks")
+        print(f"  whole chunks: {whole * 1000:>6.2f} ms per edit")
+        print(f"dirty sections: {sections * 1000:>6.2f} ms per edit ({whole / sections:.1f}x faster)")
+        world.close()
+
+
+if __name__ == "__main__":
+    main()
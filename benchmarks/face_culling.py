@@ -0,0 +1,119 @@
+import pathlib
+import tempfile
+
+import numpy as np
+from mugen.components import World
+from mugen.renderer.meshes import ChunkMesh
+from mugen.utils import RegionStore, build_chunk_mesh
+from mugen.utils.mesh_builder import (
+    CHUNK_AREA,
+    CHUNK_SIZE,
+    CHUNK_VOLUME,
+    FACE_NORMALS,
+    add_quad,
+    get_neighbours,
+    is_enclosed,
+)
+from mugen.utils.storage import DENSE, decode_voxels, get_voxel
+from numba import njit
+
+from .headless import HeadlessApp, timed
+
+# neighbours around a face in the order ambient occlusion sums them, for faces along y, x and z
+RINGS = np.array(
+    [
+        [(0, 0, -1), (-1, 0, -1), (-1, 0, 0), (-1, 0, 1), (0, 0, 1), (1, 0, 1), (1, 0, 0), (1, 0, -1)],
+        [(0, 0, -1), (0, -1, -1), (0, -1, 0), (0, -1, 1), (0, 0, 1), (0, 1, 1), (0, 1, 0), (0, 1, -1)],
+        [(-1, 0, 0), (-1, -1, 0), (0, -1, 0), (1, -1, 0), (1, 0, 0), (1, 1, 0), (0, 1, 0), (-1, 1, 0)],
+    ],
+    dtype=np.int64,
+)
+
+
+@njit(cache=True)  # type: ignore
+def is_voxel_visible(local_pos, world_voxels, neighbours):  # type: ignore
+    # one lookup through the neighbouring chunks per voxel, local positions stray at most one voxel out of the chunk
+    x, y, z = local_pos
+    nx = 0 if x < 0 else 2 if x >= CHUNK_SIZE else 1
+    ny = 0 if y < 0 else 2 if y >= CHUNK_SIZE else 1
+    nz = 0 if z < 0 else 2 if z >= CHUNK_SIZE else 1
+    idx = neighbours[nx + 3 * nz + 9 * ny]
+    if idx == -1:
+        return False
+    mode = world_voxels.modes[idx]
+    if mode >= 0:
+        return mode == 0
+    x -= (nx - 1) * CHUNK_SIZE
+    y -= (ny - 1) * CHUNK_SIZE
+    z -= (nz - 1) * CHUNK_SIZE
+    return get_voxel(world_voxels, idx, x + z * CHUNK_SIZE + y * CHUNK_AREA) == 0
+
+
+@njit(cache=True)  # type: ignore
+def get_chunk_voxels(chunk_idx, world_voxels):  # type: ignore
+    if world_voxels.modes[chunk_idx] == DENSE:
+        return world_voxels.voxels[chunk_idx]
+    chunk_voxels = np.empty(CHUNK_VOLUME, dtype=np.uint8)
+    decode_voxels(world_voxels, chunk_idx, chunk_voxels)
+    return chunk_voxels
+
+
+@njit(cache=True)  # type: ignore
+def build_scalar_chunk_mesh(chunk_idx, position, world_voxels, vertex, y0, y1):  # type: ignore
+    # the mesher before bitmask culling and the padded volume, six visibility lookups through the neighbouring
+    # chunks for every solid voxel and eight for every face
+    mode = world_voxels.modes[chunk_idx]
+    neighbours = get_neighbours(position, world_voxels.positions)
+    if mode == 0 or (mode > 0 and is_enclosed(world_voxels, neighbours)):
+        return np.empty(0, dtype=np.uint32)
+    chunk_voxels = get_chunk_voxels(chunk_idx, world_voxels)
+    o = np.empty(8, dtype=np.int64)
+    idx = 0
+    for x in range(CHUNK_SIZE):
+        for y in range(y0, y1):
+            for z in range(CHUNK_SIZE):
+                voxel_id = chunk_voxels[x + CHUNK_SIZE * z + CHUNK_AREA * y]
+                if not voxel_id:
+                    continue
+                for face_id in range(6):
+                    dx, dy, dz = FACE_NORMALS[face_id]
+                    px, py, pz = x + dx, y + dy, z + dz
+                    if not is_voxel_visible((px, py, pz), world_voxels, neighbours):
+                        continue
+                    ring = RINGS[face_id // 2 if face_id < 4 else 2]
+                    for i in range(8):
+                        sample = (px + ring[i, 0], py + ring[i, 1], pz + ring[i, 2])
+                        o[i] = is_voxel_visible(sample, world_voxels, neighbours)
+                    key = (voxel_id << 8) | ((o[0] + o[1] + o[2]) << 6) | ((o[6] + o[7] + o[0]) << 4)
+                    key |= ((o[4] + o[5] + o[6]) << 2) | (o[2] + o[3] + o[4])
+                    n, a, b = (y, x, z) if face_id < 2 else (x, y, z) if face_id < 4 else (z, x, y)
+                    idx = add_quad(vertex, idx, face_id, n, a, b, 1, 1, key)
+    return vertex[:idx].copy()
+
+
+def main() -> None:
+    app = HeadlessApp()
+    with tempfile.TemporaryDirectory() as directory:
+        world = World(app, store=RegionStore(pathlib.Path(directory)))  # type: ignore
+        chunks = [chunk for chunk in world.chunks if chunk is not None]
+        world._build_voxels(chunks)
+        arrays = world.storage.arrays
+
+        scratch = ChunkMesh.get_scratch()
+
+        for name, mesher in (("scalar", build_scalar_chunk_mesh), ("bitmask", build_chunk_mesh)):
+            elapsed = timed(
+                lambda: [mesher(c.index, c.position, arrays, scratch, 0, CHUNK_SIZE) for c in chunks], repeat=3
+            )
+            print(f"{name:>8}: meshed {len(chunks)} chunks in {elapsed:.3f}s")
+
+        for chunk in chunks:
+            scalar = build_scalar_chunk_mesh(chunk.index, chunk.position, arrays, scratch, 0, CHUNK_SIZE)
+            bitmask = build_chunk_mesh(chunk.index, chunk.position, arrays, scratch, 0, CHUNK_SIZE)
+            assert np.array_equal(scalar, bitmask), f"meshes of chunk {chunk.position} differ"
+        print("bitmask and scalar meshes are identical")
+        world.close()
+
+
+if __name__ == "__main__":
+    main()
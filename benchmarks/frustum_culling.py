@@ -0,0 +1,61 @@
+import math
+import types
+
+import glm
+import numpy as np
+from mugen.components.chunk import LOADED
+from mugen.components.culling import ChunkCuller
+from mugen.renderer import Camera
+from mugen.utils import ALL_FACES, CHUNK, PLAYER, WORLD
+
+from .headless import timed
+
+COUNTS = (WORLD.VOLUME, 10_000, 100_000)
+
+
+def get_chunks(count: int, camera: Camera) -> list[types.SimpleNamespace]:
+    # columns of chunks in a square around the camera, as many as the world would hold at that size
+    side = math.ceil(math.sqrt(count / WORLD.HEIGHT))
+    cx, _, cz = (int(axis) for axis in camera.position // CHUNK.SIZE)
+    columns = ((cx + x - side // 2, cz + z - side // 2) for x in range(side) for z in range(side))
+    positions = ((x, y, z) for x, z in columns for y in range(WORLD.HEIGHT))
+    return [
+        types.SimpleNamespace(center=(glm.vec3(position) + 0.5) * CHUNK.SIZE)
+        for position, _ in zip(positions, range(count))
+    ]
+
+
+def main() -> None:
+    camera = Camera(position=PLAYER.POSITION)
+    camera.update()
+    frustum = camera.frustum
+    print("chunks  visible  per chunk ms  vectorized ms  tiled ms  cached ms")
+    for count in COUNTS:
+        chunks = get_chunks(count, camera)
+        centers = np.array([chunk.center for chunk in chunks], dtype=np.float32)
+        positions = (centers // CHUNK.SIZE).astype(np.int32)
+        flags, connectivity = np.full(count, LOADED, dtype=np.uint8), np.full(count, ALL_FACES, dtype=np.int64)
+        culler = ChunkCuller(camera, centers, positions, flags, connectivity, occlusion=False)
+        each = [index for index, chunk in enumerate(chunks) if frustum.is_on_frustum(chunk)]  # type: ignore
+        visible = np.flatnonzero(frustum.get_visible(centers))
+        assert np.array_equal(each, visible), f"culling of {count} chunks differs"
+        assert np.array_equal(culler.get_visible(), visible), f"tiled culling of {count} chunks differs"
+
+        def recull() -> None:
+            # a camera that moved every frame
+            culler._key = None
+            culler.get_visible()
+
+        per_chunk = timed(lambda: [chunk for chunk in chunks if frustum.is_on_frustum(chunk)], repeat=5)  # type: ignore
+        vectorized = timed(lambda: np.flatnonzero(frustum.get_visible(centers)), repeat=20)
+        tiled = timed(recull, repeat=20)
+        cached = timed(culler.get_visible, repeat=20)
+        print(
+            f"{count:>6}  {len(visible):>7}  {per_chunk * 1000:>12.3f}  {vectorized * 1000:>13.3f}  "
+            f"{tiled * 1000:>8.3f}  {cached * 1000:>9.4f}"
+        )
+    print("per chunk, vectorized and tiled culling agree")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+import pathlib
+import tempfile
+
+import numpy as np
+from mugen.components import World
+from mugen.renderer.meshes import ChunkMesh
+from mugen.utils import RegionStore
+
+from .headless import HeadlessApp, timed
+
+
+def unit_faces(faces: np.ndarray) -> np.ndarray:
+    # every face split back into unit faces, rows of (x, y, z, face_id, voxel_id, flip, ao of the 4 corners)
+    head, size = faces.reshape(-1, 2).astype(np.int64).T
+    face_id = (head >> 3) & 7
+    # axes spanning the faces along y, x and z
+    axes = np.array([((1, 0, 0), (0, 0, 1)), ((0, 1, 0), (0, 0, 1)), ((1, 0, 0), (0, 1, 0))])[face_id >> 1]
+    w, h = (size >> 26) & 63, (size >> 20) & 63
+    counts = w * h
+    face = np.repeat(np.arange(len(head)), counts)
+    k = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+    origin = np.stack(((head >> 26) & 63, (head >> 20) & 63, (head >> 14) & 63), axis=1)
+    position = origin[face] + axes[face, 0] * (k % w[face])[:, None] + axes[face, 1] * (k // w[face])[:, None]
+    rows = np.column_stack((position, face_id[face], (head[face] >> 6) & 255, (size[face] >> 8) & 1, size[face] & 255))
+    return rows[np.lexsort(rows.T[::-1])]
+
+
+def main() -> None:
+    app = HeadlessApp()
+    with tempfile.TemporaryDirectory() as directory:
+        world = World(app, store=RegionStore(pathlib.Path(directory)))  # type: ignore
+        chunks = [chunk for chunk in world.chunks if chunk is not None]
+        world._build_voxels(chunks)
+
+        meshes = {}
+        for greedy in (False, True):
+            meshes[greedy] = [np.concatenate(ChunkMesh.get_vertex_data(chunk, greedy=greedy)) for chunk in chunks]
+            elapsed = timed(lambda: [ChunkMesh.get_vertex_data(chunk, greedy=greedy) for chunk in chunks], repeat=3)
+            faces = sum(len(mesh) for mesh in meshes[greedy]) // 2
+            nbytes = sum(mesh.nbytes for mesh in meshes[greedy])
+            print(
+                f"{'greedy' if greedy else 'per face':>9}: {faces:>9} faces, {nbytes / 2**20:>6.1f} MiB, "
+                f"meshed {len(chunks)} chunks in {elapsed:.3f}s"
+            )
+        per_face, greedy = (sum(len(mesh) for mesh in meshes[mode]) for mode in (False, True))
+        print(f"greedy meshing keeps {greedy / per_face:.1%} of the faces ({per_face / greedy:.2f}x fewer)")
+
+        # same voxel, face, flip and ao on every unit face, so the greedy mesh renders identically
+        for chunk, a, b in zip(chunks, meshes[False], meshes[True]):
+            assert np.array_equal(unit_faces(a), unit_faces(b)), f"faces of chunk {chunk.position} differ"
+        print("greedy and per face meshes cover the same unit faces")
+        world.close()
+
+
+if __name__ == "__main__":
+    main()
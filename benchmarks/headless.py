@@ -0,0 +1,62 @@
+import os
+import time
+import typing as t
+
+import moderngl
+from mugen.components import Chunk
+from mugen.renderer import Camera, Shader
+from mugen.utils import PLAYER, Logger
+
+__all__: tuple[str, ...] = (
+    "HeadlessApp",
+    "is_visible",
+    "render_chunk",
+    "timed",
+)
+
+
+class HeadlessApp:
+    # stand-in for `Mugen` owning a standalone GL context instead of a window
+    _logger: Logger = Logger(name="Benchmark", file_logging=False)
+
+    def __init__(self) -> None:
+        settings: dict[str, t.Any] = {"require": 430}
+        if backend := os.environ.get("MUGEN_GL_BACKEND"):
+            settings["backend"] = backend
+        self.ctx = moderngl.create_standalone_context(**settings)
+        self.ctx.gc_mode = "auto"
+        self.ctx.enable(flags=moderngl.BLEND | moderngl.CULL_FACE | moderngl.DEPTH_TEST)
+        self._logger.setLevel(os.environ.get("MUGEN_LOG_LEVEL", "WARNING"))
+        self._time = 0.0
+        self._delta_time = 0.0
+        self._player = Camera(position=PLAYER.POSITION)
+        self._player.update()
+        self._shader = Shader(app=self)  # type: ignore
+
+    @property
+    def logger(self) -> Logger:
+        return self._logger
+
+    @property
+    def shader(self) -> Shader:
+        return self._shader
+
+
+def timed(func: t.Callable[[], t.Any], repeat: int = 1) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def is_visible(chunk: Chunk) -> bool:
+    # what the frame checked of every chunk before culling moved to the arrays of the world
+    return chunk.mesh is not None and chunk.mesh.vao is not None and not chunk._is_empty and chunk.is_on_frustum(chunk)
+
+
+def render_chunk(chunk: Chunk) -> None:
+    # a visible chunk drawn on its own instead of in the single indirect draw of the world
+    if chunk.mesh is not None and is_visible(chunk):
+        chunk.world.vertex_arena.render(chunk.mesh.command[None])
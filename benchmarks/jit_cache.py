@@ -0,0 +1,38 @@
+import os
+import subprocess
+import sys
+import tempfile
+
+from .headless import timed
+
+# a fresh interpreter building the initial world window, the part of startup the kernel cache covers
+STARTUP = """
+import pathlib, random, sys, tempfile
+from benchmarks.headless import HeadlessApp
+from mugen.components import World
+from mugen.utils import RegionStore
+app = HeadlessApp()
+store = RegionStore(pathlib.Path(tempfile.mkdtemp()), seed=int(sys.argv[1]))
+World(app, store=store).close()  # type: ignore
+"""
+
+
+def run(*args: str, cache_dir: str) -> float:
+    env = {**os.environ, "NUMBA_CACHE_DIR": cache_dir}
+    return timed(lambda: subprocess.run([sys.executable, *args], env=env, check=True, capture_output=True))
+
+
+def main() -> None:
+    with tempfile.TemporaryDirectory() as cache_dir:
+        cold = run("-c", STARTUP, "1", cache_dir=cache_dir)
+        warmup = run(".", "--warmup", cache_dir=cache_dir)
+        # seeds are kernel arguments, so a world with a different seed still hits the cache
+        warm = [run("-c", STARTUP, str(seed), cache_dir=cache_dir) for seed in (1, 2**40 + 7)]
+    print(f"cold startup:          {cold:.2f}s")
+    print(f"warm-up command:       {warmup:.2f}s")
+    print(f"warm startup (seed 1): {warm[0]:.2f}s ({cold / warm[0]:.1f}x)")
+    print(f"warm startup (seed 2): {warm[1]:.2f}s ({cold / warm[1]:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
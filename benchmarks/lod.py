@@ -0,0 +1,59 @@
+import pathlib
+import tempfile
+
+import moderngl
+import numpy as np
+from mugen.components import World
+from mugen.renderer import Textures
+from mugen.renderer.meshes import ChunkMesh
+from mugen.utils import CHUNK, WINDOW, RegionStore
+from nptyping import NDArray, Shape, UInt8, UInt32
+
+from .headless import HeadlessApp, timed
+
+SKY = (0.58, 0.83, 0.99)
+
+
+def draw(world: World, fbo: moderngl.Framebuffer) -> NDArray[Shape["*, 3"], UInt8]:
+    fbo.use()
+    fbo.clear(*SKY)
+    world.render()
+    return np.frombuffer(fbo.read(components=3), dtype=np.uint8).reshape(-1, 3)
+
+
+def main() -> None:
+    app = HeadlessApp()
+    app._textures = Textures(app=app)  # type: ignore
+    with tempfile.TemporaryDirectory() as directory:
+        world = World(app, store=RegionStore(pathlib.Path(directory)))  # type: ignore
+        world.pipeline.finish()
+        chunks = [chunk for chunk in world.chunks if chunk is not None and chunk.mesh is not None]
+        levels = np.bincount([chunk.lod for chunk in chunks], minlength=len(CHUNK.LOD_DISTANCES) + 1)
+        print(f"{len(chunks)} meshed chunks per level of detail: {levels.tolist()}")
+
+        def mesh(lods: list[int]) -> list[list[NDArray[Shape["*"], UInt32]]]:
+            return [ChunkMesh.get_vertex_data(chunk, lod=lod) for chunk, lod in zip(chunks, lods)]
+
+        for label, lods in (("full detail", [0] * len(chunks)), ("by distance", [chunk.lod for chunk in chunks])):
+            elapsed = timed(lambda: mesh(lods), repeat=3)
+            faces = sum(len(section) for data in mesh(lods) for section in data) // 2
+            print(f"{label:>12}: {faces:>10} faces, meshed in {elapsed:.3f}s")
+
+        # terrain drawn at full detail that turns into sky with distant chunks coarser is a crack along a seam
+        fbo = app.ctx.simple_framebuffer(WINDOW.RESOLUTION)
+        app.shader.update()
+        fbo.use()
+        fbo.clear(*SKY)
+        sky = np.frombuffer(fbo.read(viewport=(0, 0, 1, 1), components=3), dtype=np.uint8)
+        coarse = draw(world, fbo)
+        for chunk in chunks:
+            chunk.mesh._rebuild(lod=0)  # type: ignore
+        full = draw(world, fbo)
+        cracks = np.all(coarse == sky, axis=1) & ~np.all(full == sky, axis=1)
+        differ = np.count_nonzero(~np.all(coarse == full, axis=1))
+        print(f"{differ} of {len(full)} pixels differ from full detail, {np.count_nonzero(cracks)} show sky")
+        world.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,38 @@
+import mmap
+import pathlib
+import tempfile
+
+from mugen.components import World
+from mugen.utils import RegionStore
+from mugen.utils.tracer import resident
+
+from .headless import HeadlessApp
+
+# the same terrain on every run, so trees can be compared
+SEED = 1
+
+
+def mapped() -> int:
+    # virtual size of this process, counts allocations whether or not their pages were ever touched
+    pages = int(pathlib.Path("/proc/self/statm").read_text().split()[0])
+    return pages * mmap.PAGESIZE
+
+
+def main() -> None:
+    app = HeadlessApp()
+    with tempfile.TemporaryDirectory() as directory:
+        # first build pays for JIT compilation
+        World(app, store=RegionStore(pathlib.Path(directory) / "warmup", seed=SEED)).close()  # type: ignore
+        before = resident(), mapped()
+        world = World(app, store=RegionStore(pathlib.Path(directory) / "world", seed=SEED))  # type: ignore
+        after = resident(), mapped()
+        meshes = [chunk.mesh.vertices for chunk in world.chunks if chunk is not None and chunk.mesh is not None]
+        nbytes = sum(vertices.nbytes for vertices in meshes)
+        print(f"meshes:        {len(meshes)}, {nbytes / 2**20:.1f} MiB of vertices")
+        print(f"rss:           {before[0] / 2**20:.1f} MiB before the world, {after[0] / 2**20:.1f} MiB after")
+        print(f"mapped:        {before[1] / 2**20:.1f} MiB before the world, {after[1] / 2**20:.1f} MiB after")
+        world.close()
+
+
+if __name__ == "__main__":
+    main()
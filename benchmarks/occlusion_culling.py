@@ -0,0 +1,96 @@
+import pathlib
+import tempfile
+
+import glm
+import numpy as np
+from mugen.components import World
+from mugen.utils import ALL_FACES, CHUNK, PLAYER, WORLD, RegionStore, get_face_connectivity
+
+from .headless import HeadlessApp, timed
+
+YAWS = tuple(range(0, 360, 45))
+DEPTH = 8
+
+
+def find_underground(world: World, voxel: bool) -> glm.vec3 | None:
+    # a voxel of air or stone in the middle column more than DEPTH voxels below its surface
+    x, z = int(PLAYER.POSITION.x), int(PLAYER.POSITION.z)
+    column = [bool(world.chunk_manager.get_voxel_id(glm.ivec3(x, y, z))[0]) for y in range(WORLD.HEIGHT * CHUNK.SIZE)]
+    surface = max((y for y, solid in enumerate(column) if solid), default=0)
+    for y in range(surface - DEPTH, 0, -1):
+        if column[y] == voxel:
+            return glm.vec3(x, y, z) + 0.5
+    return None
+
+
+def bury(world: World, position: glm.vec3) -> None:
+    # every chunk turned to stone but for a tunnel along x through the position, the deep cave this terrain lacks
+    x, y, z = (int(axis) for axis in position)
+    for chunk in world.chunks:
+        if chunk is None:
+            continue
+        voxels = world.storage.materialize(chunk.index)
+        voxels[:] = 1
+        cx, cy, cz = (axis * CHUNK.SIZE for axis in chunk.position)
+        if cy <= y < cy + CHUNK.SIZE and cz <= z < cz + CHUNK.SIZE:
+            voxels.reshape(CHUNK.SIZE, CHUNK.SIZE, CHUNK.SIZE)[y - cy - 2 : y - cy + 2, z - cz - 2 : z - cz + 2] = 0
+        chunk.update_connectivity()
+
+
+def count(world: World, position: glm.vec3) -> tuple[int, int, float, float]:
+    # chunks drawn and ms per cull summed over every direction, frustum only then with occlusion
+    camera, culler = world.app._player, world.culler
+    camera.position = glm.vec3(position)
+    totals = [0, 0, 0.0, 0.0]
+    for yaw in YAWS:
+        camera.yaw = glm.radians(yaw)
+        camera.update()
+        for column, occlusion in enumerate((False, True)):
+            culler.occlusion = occlusion
+
+            def recull() -> None:
+                # a camera that moved every frame
+                culler._key = None
+                culler.get_visible()
+
+            totals[2 + column] += timed(recull, repeat=5) * 1000 / len(YAWS)
+            totals[column] += len(culler.get_visible())
+    culler.occlusion = WORLD.OCCLUSION_CULLING
+    return totals[0], totals[1], totals[2], totals[3]  # type: ignore
+
+
+def main() -> None:
+    app = HeadlessApp()
+    with tempfile.TemporaryDirectory() as directory:
+        world = World(app, store=RegionStore(pathlib.Path(directory)))  # type: ignore
+        chunks = [chunk for chunk in world.chunks if chunk is not None]
+        world._build_voxels(chunks)
+        arrays = world.storage.arrays
+        mixed = [chunk.index for chunk in chunks if arrays.modes[chunk.index] < 0]
+        elapsed = timed(lambda: [get_face_connectivity(index, arrays) for index in mixed], repeat=3)
+        closed = np.count_nonzero(world.connectivity[mixed] != ALL_FACES)
+        print(
+            f"connectivity of {len(mixed)} mixed chunks in {elapsed * 1000:.1f} ms, "
+            f"{closed} of them block some path of air"
+        )
+
+        sites = {
+            "surface": PLAYER.POSITION,
+            "cave": find_underground(world, voxel=False),
+            "solid rock": find_underground(world, voxel=True),
+        }
+        print(f"chunks drawn over {len(YAWS)} directions of {WORLD.VOLUME}, frustum only / with occlusion, ms per cull")
+        for label, position in sites.items():
+            if position is None:
+                print(f"{label:>10}: no site found")
+                continue
+            frustum, occluded, frustum_ms, occluded_ms = count(world, position)
+            print(f"{label:>10}: {frustum:>5} / {occluded:>5} chunks, {frustum_ms:.3f} / {occluded_ms:.3f} ms")
+        bury(world, PLAYER.POSITION)
+        frustum, occluded, frustum_ms, occluded_ms = count(world, PLAYER.POSITION)
+        print(f"{'tunnel':>10}: {frustum:>5} / {occluded:>5} chunks, {frustum_ms:.3f} / {occluded_ms:.3f} ms")
+        world.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+import pathlib
+import tempfile
+import time
+
+import glm
+import moderngl
+import numpy as np
+from mugen.components import World
+from mugen.renderer import Textures
+from mugen.utils import CHUNK, PLAYER, WINDOW, WORLD, RegionStore
+from nptyping import NDArray, Shape, UInt8
+
+from .headless import HeadlessApp
+
+SKY = (0.58, 0.83, 0.99)
+FRAMES = 10
+YAWS = tuple(range(0, 360, 90))
+
+
+def draw(world: World, fbo: moderngl.Framebuffer) -> int:
+    # one frame as `Scene.render` draws the world, chunks drawn
+    fbo.use()
+    fbo.clear(*SKY)
+    world.render()
+    world.query_occlusion()
+    if world.queries is None:
+        return len(world.culler.get_visible())
+    return int(np.count_nonzero(~world.queries.hidden[world.culler.get_visible()]))
+
+
+def read(fbo: moderngl.Framebuffer) -> NDArray[Shape["*, 3"], UInt8]:
+    return np.frombuffer(fbo.read(components=3), dtype=np.uint8).reshape(-1, 3)
+
+
+def find_ground(world: World) -> glm.vec3:
+    # eye height above the surface of the middle column, where hills hide what lies behind them
+    x, z = int(PLAYER.POSITION.x), int(PLAYER.POSITION.z)
+    column = (world.chunk_manager.get_voxel_id(glm.ivec3(x, y, z))[0] for y in range(WORLD.HEIGHT * CHUNK.SIZE))
+    surface = max((y for y, voxel in enumerate(column) if voxel), default=0)
+    return glm.vec3(x, surface + 2, z) + 0.5
+
+
+def main() -> None:
+    app = HeadlessApp()
+    app._textures = Textures(app=app)  # type: ignore
+    fbo = app.ctx.simple_framebuffer(WINDOW.RESOLUTION)
+    with tempfile.TemporaryDirectory() as directory:
+        store = RegionStore(pathlib.Path(directory))
+        worlds = {
+            queries: World(app, store=store, occlusion_queries=queries) for queries in (False, True)  # type: ignore
+        }
+        camera = app._player
+        sites = {"above": PLAYER.POSITION, "ground": find_ground(worlds[False])}
+        print("chunks drawn and ms per frame, frustum only / with occlusion queries")
+        for label, position in sites.items():
+            camera.position = glm.vec3(position)
+            for yaw in YAWS:
+                camera.yaw = glm.radians(yaw)
+                camera.update()
+                app.shader.update()
+                drawn, elapsed, pixels = {}, {}, {}
+                for queries, world in worlds.items():
+                    # chunks coming into view are requested by the first frame, the last ones are queried in before
+                    # frames can leave chunks out
+                    draw(world, fbo)
+                    while world.pipeline.pending:
+                        world.pipeline.finish()
+                        draw(world, fbo)
+                    for _ in range(WORLD.QUERY_LATENCY):
+                        draw(world, fbo)
+                    app.ctx.finish()
+                    start = time.perf_counter()
+                    for _ in range(FRAMES):
+                        drawn[queries] = draw(world, fbo)
+                    app.ctx.finish()
+                    elapsed[queries] = (time.perf_counter() - start) / FRAMES
+                    pixels[queries] = read(fbo)
+                differ = np.count_nonzero(np.any(pixels[False] != pixels[True], axis=1))
+                print(
+                    f"{label:>6} yaw {yaw:>3}: {drawn[False]:>4} / {drawn[True]:>4} chunks, "
+                    f"{elapsed[False] * 1000:>7.2f} / {elapsed[True] * 1000:>7.2f} ms, {differ} pixels differ"
+                )
+        for world in worlds.values():
+            world.close()
+
+
+if __name__ == "__main__":
+    main()
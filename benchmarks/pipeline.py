@@ -0,0 +1,81 @@
+import pathlib
+import tempfile
+import time
+
+import glm
+import numpy as np
+from mugen.components import World
+from mugen.renderer.meshes import ChunkMesh
+from mugen.utils import WINDOW, RegionStore
+
+from .headless import HeadlessApp, render_chunk
+
+TURN_FRAMES = 60
+MAX_FRAMES = 1000
+
+
+def render_synchronously(world: World) -> None:
+    # the lazy path the pipeline replaced, building and meshing chunks inside the frame
+    for chunk in world.chunks:
+        if chunk is not None and chunk.mesh is None and chunk.is_on_frustum(chunk):
+            for neighbour in (*world.get_neighbours(chunk), chunk):
+                neighbour._build_voxels()
+            chunk._build_mesh(ChunkMesh.get_vertex_data(chunk, lod=chunk.lod))
+    for chunk in world.chunks:
+        if chunk is not None:
+            render_chunk(chunk)
+
+
+def turn(app: HeadlessApp, world: World, synchronous: bool) -> list[float]:
+    # half a turn over a second, then keep rendering until every visible chunk is meshed
+    frames = []
+    for frame in range(MAX_FRAMES):
+        start = time.perf_counter()
+        if frame < TURN_FRAMES:
+            app._player.rotate_yaw(glm.pi() / TURN_FRAMES)
+        app._player.update()
+        world.update()
+        if synchronous:
+            render_synchronously(world)
+        else:
+            world.render()
+        app.ctx.finish()
+        elapsed = time.perf_counter() - start
+        frames.append(elapsed)
+        if frame >= TURN_FRAMES and not world.pipeline.pending:
+            break
+        # frames are paced like the game loop, the idle time is what the workers run in on a single core
+        time.sleep(max(1 / WINDOW.FPS - elapsed, 0))
+    return frames
+
+
+def main() -> None:
+    app = HeadlessApp()
+    with tempfile.TemporaryDirectory() as directory:
+        # first world pays for JIT compilation
+        World(app, store=RegionStore(pathlib.Path(directory) / "warmup")).close()  # type: ignore
+        worlds = []
+        for name, synchronous in (("synchronous", True), ("pipeline", False)):
+            app._player.yaw = glm.radians(-90.0)
+            app._player.update()
+            world = World(app, store=RegionStore(pathlib.Path(directory) / name))  # type: ignore
+            frames = np.array(turn(app, world, synchronous)) * 1000
+            meshed = sum(chunk is not None and chunk.mesh is not None for chunk in world.chunks)
+            print(
+                f"{name:>12}: {len(frames)} frames, {meshed} meshes, worst {frames.max():.1f} ms, "
+                f"p99 {np.percentile(frames, 99):.1f} ms, median {np.median(frames):.1f} ms, "
+                f"busy {frames.sum() / 1000:.2f}s"
+            )
+            worlds.append(world)
+
+        for a, b in zip(*(world.chunks for world in worlds)):
+            assert a is not None and b is not None and (a.mesh is None) == (b.mesh is None)
+            if a.mesh is not None and b.mesh is not None:
+                assert np.array_equal(a.mesh.vertices, b.mesh.vertices), f"mesh of {a.position} differs"
+        print("synchronous and pipeline meshes are identical")
+        for world in worlds:
+            world.close()
+
+
+if __name__ == "__main__":
+    main()
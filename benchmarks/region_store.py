@@ -0,0 +1,50 @@
+import pathlib
+import tempfile
+
+import numpy as np
+from mugen.components import World
+from mugen.utils import RegionStore
+
+from .headless import HeadlessApp, timed
+
+
+def discard(world: World) -> None:
+    # rebuilding replaces every chunk, unsaved ones must not leak into the store under test
+    for chunk in world.chunks:
+        if chunk is not None:
+            chunk.is_dirty = False
+
+
+def main() -> None:
+    app = HeadlessApp()
+    with tempfile.TemporaryDirectory() as directory:
+        # first build pays for JIT compilation
+        world = World(app, store=RegionStore(pathlib.Path(directory) / "warmup"))  # type: ignore
+        discard(world)
+        world.store = RegionStore(pathlib.Path(directory) / "world")
+
+        world.height_maps.clear()
+        generate = timed(world._build_chunks)
+        built = [chunk for chunk in world.chunks if chunk is not None and chunk.is_built]
+        generated = {chunk.index: world.storage.decode(chunk.index) for chunk in built}
+        save = timed(world.save)
+        size = sum(path.stat().st_size for path in world.store.directory.glob("*.mgr"))
+
+        # a fresh store reopens the region files like a restart would
+        discard(world)
+        world.store.close()
+        world.store = RegionStore(world.store.directory)
+        world.height_maps.clear()
+        load = timed(world._build_chunks)
+
+        for index, voxels in generated.items():
+            assert np.array_equal(world.storage.decode(index), voxels), "loaded voxels differ from generated ones"
+        print(f"chunks:          {len(generated)}")
+        print(f"cold generation: {generate:.3f}s")
+        print(f"save:            {save:.3f}s ({size / 2**20:.2f} MiB on disk)")
+        print(f"load from store: {load:.3f}s ({generate / load:.1f}x faster)")
+        world.store.close()
+
+
+if __name__ == "__main__":
+    main()
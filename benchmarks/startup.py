@@ -0,0 +1,32 @@
+import pathlib
+import sys
+import tempfile
+
+from mugen.components import Clouds, World
+from mugen.utils import RegionStore, tracer
+
+from .headless import HeadlessApp
+
+
+def main() -> None:
+    # traces the headless part of startup, the window, textures and imports are covered by `python . --trace`
+    path = pathlib.Path(sys.argv[1]) if len(sys.argv) > 1 else None
+    with tempfile.TemporaryDirectory() as directory:
+        tracer.start(path)
+        with tracer.span("headless app"):
+            app = HeadlessApp()
+        with tracer.span("world"):
+            world = World(app, store=RegionStore(pathlib.Path(directory)))  # type: ignore
+        with tracer.span("clouds"):
+            Clouds(app, world.seed)  # type: ignore
+        with tracer.span("first frame"):
+            world.render()
+            app.ctx.finish()
+        print(tracer.stop())
+        world.close()
+    if path is not None:
+        print(f"chrome trace written to {path}")
+
+
+if __name__ == "__main__":
+    main()
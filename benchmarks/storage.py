@@ -0,0 +1,44 @@
+import pathlib
+import tempfile
+
+import numpy as np
+from mugen.components import World
+from mugen.renderer.meshes import ChunkMesh
+from mugen.utils import CHUNK, RegionStore
+from mugen.utils.storage import DENSE, PALETTE
+from mugen.utils.tracer import resident
+
+from .headless import HeadlessApp, timed
+
+
+def main() -> None:
+    app = HeadlessApp()
+    with tempfile.TemporaryDirectory() as directory:
+        # first build pays for JIT compilation
+        World(app, store=RegionStore(pathlib.Path(directory) / "warmup"))  # type: ignore
+        before = resident()
+        world = World(app, store=RegionStore(pathlib.Path(directory) / "world"))  # type: ignore
+        compact = resident() - before
+        chunks = [chunk for chunk in world.chunks if chunk is not None and chunk.is_built]
+        modes = world.storage.arrays.modes[[chunk.index for chunk in chunks]]
+        mesh_compact = timed(lambda: [ChunkMesh.get_vertex_data(chunk) for chunk in chunks], repeat=3)
+        compact_bytes = world.storage.nbytes
+
+        for chunk in chunks:
+            world.storage.materialize(chunk.index)
+        dense = resident() - before
+        mesh_dense = timed(lambda: [ChunkMesh.get_vertex_data(chunk) for chunk in chunks], repeat=3)
+
+        print(f"chunks:             {len(chunks)}")
+        print(f"  uniform air:      {np.count_nonzero(modes == 0)}")
+        print(f"  uniform solid:    {np.count_nonzero(modes > 0)}")
+        print(f"  palette:          {np.count_nonzero(modes == PALETTE)}")
+        print(f"  dense:            {np.count_nonzero(modes == DENSE)}")
+        dense_bytes = len(chunks) * CHUNK.VOLUME
+        print(f"voxel bytes:        {compact_bytes / 2**20:.1f} MiB (dense {dense_bytes / 2**20:.1f} MiB)")
+        print(f"world rss:          {compact / 2**20:.1f} MiB (all dense {dense / 2**20:.1f} MiB)")
+        print(f"meshing:            {mesh_compact:.3f}s (all dense {mesh_dense:.3f}s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+import pathlib
+import tempfile
+
+import glm
+import numpy as np
+from mugen.components import Chunk, World
+from mugen.renderer.meshes import ChunkMesh
+from mugen.utils import CHUNK, RegionStore
+from mugen.utils.tracer import resident
+
+from .headless import HeadlessApp, timed
+
+STEPS = 8
+STRIDE = 4
+
+
+def vertices(chunk: Chunk) -> np.ndarray:
+    return np.concatenate(ChunkMesh.get_vertex_data(chunk))
+
+
+def settle(world: World) -> None:
+    world.render()
+    world.pipeline.finish()
+
+
+def main() -> None:
+    app = HeadlessApp()
+    with tempfile.TemporaryDirectory() as directory:
+        world = World(app, store=RegionStore(pathlib.Path(directory) / "world"), streaming=True)  # type: ignore
+        settle(world)
+        start = glm.vec3(app._player.position)
+        # walk out and most of the way back, returning columns come back from the region store
+        path = [STRIDE] * STEPS + [-STRIDE] * (STEPS - 1)
+        print(f"{'offset':>7} {'loaded':>7} {'regions':>8} {'rss MiB':>8} {'gpu MiB':>8} {'step s':>7}")
+        for step in [0, *path]:
+            app._player.position.x += step * CHUNK.SIZE
+            elapsed = timed(lambda: (world.update(), settle(world)))
+            loaded = sum(chunk is not None for chunk in world.chunks)
+            offset = (app._player.position.x - start.x) / CHUNK.SIZE
+            print(
+                f"{offset:>7.0f} {loaded:>7} {len(world.store._regions):>8} "
+                f"{resident() / 2**20:>8.1f} {world.vertex_arena.live_bytes / 2**20:>8.1f} {elapsed:>7.3f}"
+            )
+
+        # a window reached by streaming matches one built from scratch at the same spot
+        fresh = World(app, store=RegionStore(pathlib.Path(directory) / "fresh"), streaming=True)  # type: ignore
+        settle(fresh)
+        for w in (world, fresh):
+            w._build_voxels([chunk for chunk in w.chunks if chunk is not None])
+        mismatches = 0
+        for chunk in fresh.chunks:
+            assert chunk is not None
+            streamed = world.get_chunk(chunk.position)
+            assert streamed is not None and streamed.index == chunk.index
+            mismatches += not np.array_equal(world.storage.decode(chunk.index), fresh.storage.decode(chunk.index))
+            mismatches += not np.array_equal(vertices(chunk), vertices(streamed))
+        print(f"streamed window vs freshly built window: {mismatches} mismatches")
+        world.close()
+        fresh.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+import pathlib
+import random
+import tempfile
+
+import glm
+from mugen.components import World
+from mugen.renderer.meshes import ChunkMesh
+from mugen.utils import CHUNK, RegionStore
+
+from .headless import HeadlessApp, timed
+
+SEED = 1
+EDITS = 500
+
+
+def dig(world: World, rng: random.Random) -> bool:
+    # removes the top voxel of a random column of a random meshed chunk
+    meshed = [chunk for chunk in world.chunks if chunk is not None and chunk.mesh is not None and not chunk._is_empty]
+    chunk = rng.choice(meshed)
+    manager = world.chunk_manager
+    origin = glm.ivec3(chunk.position) * CHUNK.SIZE + glm.ivec3(rng.randrange(CHUNK.SIZE), 0, rng.randrange(CHUNK.SIZE))
+    for y in reversed(range(CHUNK.SIZE)):
+        position = origin + glm.ivec3(0, y, 0)
+        voxel_id, voxel_index, _, _ = manager.get_voxel_id(position)
+        if voxel_id:
+            manager.voxel_id, manager.voxel_index = voxel_id, voxel_index
+            manager.voxel_world_pos, manager.chunk = position, chunk
+            manager.remove_voxel()
+            return True
+    return False
+
+
+def fresh_upload(mesh: ChunkMesh) -> None:
+    # what every rebuild did before the arena, a new buffer and vertex array per mesh
+    vbo = mesh.ctx.buffer(mesh.vertices)
+    vao = mesh.ctx.vertex_array(mesh.program, [], index_buffer=mesh.chunk.world.index_buffer, index_element_size=4)
+    vao.release()
+    vbo.release()
+
+
+def main() -> None:
+    app = HeadlessApp()
+    app.logger.disabled = True
+    with tempfile.TemporaryDirectory() as directory:
+        world = World(app, store=RegionStore(pathlib.Path(directory), seed=SEED))  # type: ignore
+        arena = world.vertex_arena
+        allocations = arena.allocations
+        rng = random.Random(SEED)
+        edits = sum(dig(world, rng) for _ in range(EDITS))
+        meshes = [chunk.mesh for chunk in world.chunks if chunk is not None and chunk.mesh is not None]
+        vertex_bytes = sum(mesh.vertices.nbytes for mesh in meshes)
+        print(f"edits:       {edits}, {arena.allocations - allocations} ranges allocated, {arena.growths} growths")
+        print(
+            f"gpu:         {arena.live_bytes / 2**20:.1f} MiB live for {vertex_bytes / 2**20:.1f} MiB of vertices, "
+            f"{arena.size / 2**20:.1f} MiB arena in {len(arena.free_sizes)} free ranges"
+        )
+
+        uploaded = [mesh for mesh in meshes if mesh.range is not None]
+        arena_upload = timed(lambda: [mesh.get_vao(mesh.vertices) for mesh in uploaded], repeat=5)
+        fresh = timed(lambda: [fresh_upload(mesh) for mesh in uploaded], repeat=5)
+        print(
+            f"reupload:    {len(uploaded)} meshes, {fresh * 1000:.1f} ms into new buffers, "
+            f"{arena_upload * 1000:.1f} ms into the arena"
+        )
+        world.close()
+
+
+if __name__ == "__main__":
+    main()
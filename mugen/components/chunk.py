@@ -1,13 +1,13 @@
+import threading
 import typing as t
 
 import glm
 import numba
-import numpy as np
-from nptyping import NDArray, Shape, UInt8
+from nptyping import Int32, NDArray, Shape, UInt8, UInt32
 
 from ..renderer.meshes import ChunkMesh
-from ..utils import CHUNK
-from ..utils.noise_generator import height_map, set_voxel_id
+from ..utils import CHUNK, WORLD, get_face_connectivity
+from ..utils.noise_generator import NoiseSeed, set_voxel_id
 
 if t.TYPE_CHECKING:
     from mugen import Mugen
@@ -20,50 +20,97 @@ __all__: tuple[str, ...] = ("Chunk",)
 
 CHUNK_SIZE = numba.int32(CHUNK.SIZE)
 CHUNK_AREA = numba.int32(CHUNK.AREA)
+# flags the world keeps for the chunk in every slot, a chunk is placed in it, the chunk has a mesh, built or not,
+# and building the chunk raised
+LOADED = 1
+MESHED = 2
+FAILED = 4
 
 
 class Chunk:
     mesh: ChunkMesh | None = None
-    voxels: NDArray[Shape["*, *"], UInt8] | None = None
+    is_built: bool = False
 
     def __init__(self, world: "World", app: "Mugen", position: tuple[int, int, int]) -> None:
         self.app = app
         self.world = world
         self.position = position
-        self._is_empty = True
-        self._model_matrix = glm.translate(glm.mat4(), glm.vec3(*self.position) * CHUNK.SIZE)
+        # slot in the ring buffered chunk map, chunks a window apart share it
+        x, y, z = position
+        self.index = x % WORLD.WIDTH + WORLD.WIDTH * (z % WORLD.DEPTH) + WORLD.AREA * y
+        # voxels differ from what the region store holds
+        self.is_dirty = False
+        # bumped whenever the voxels of the chunk or its neighbours change, meshes of older revisions are stale
+        self.revision = 0
+        # cleared once the chunk leaves the world and its slot is handed to another chunk
+        self.is_loaded = True
+        self._lock = threading.Lock()
         self.center = (glm.vec3(*self.position) + 0.5) * CHUNK.SIZE
         self.is_on_frustum = self.app._player.frustum.is_on_frustum
 
-    def _build_mesh(self) -> None:
+    @property
+    def _is_empty(self) -> bool:
+        # read from the storage mode, so edits never leave it stale
+        return self.world.storage.is_empty(self.index)
+
+    @property
+    def lod(self) -> int:
+        # level of detail the chunk should be drawn at, picked by the world from the distance to the camera
+        return int(self.world.lods[self.index])
+
+    def _build_mesh(self, vertex_data: list[NDArray[Shape["*"], UInt32]] | None = None, lod: int | None = None) -> None:
         if self.mesh is None:
-            self.mesh = ChunkMesh(self.app, self)
-
-    def render(self) -> None:
-        if not self._is_empty and self.is_on_frustum(self):
-            if self.mesh is None:
-                self._build_mesh()
-            self.mesh.program["uModel"].write(self._model_matrix)  # type: ignore
-            self.mesh.render()  # type: ignore
-
-    def _build_voxels(self) -> NDArray[Shape["*, *"], UInt8]:
-        if self.voxels is None:
-            _voxels = np.zeros(CHUNK.VOLUME, dtype=np.uint8)
+            self.mesh = ChunkMesh(self.app, self, vertex_data=vertex_data, lod=self.lod if lod is None else lod)
+            self.world.flags[self.index] |= MESHED
+
+    def _build_voxels(self) -> None:
+        # chunk workers build the neighbours of the chunks they mesh, so several may reach the same chunk
+        with self._lock:
+            if not self.is_built and self.is_loaded:
+                self._generate_voxels()
+
+    def _unload(self) -> None:
+        with self._lock:
+            self.is_loaded = False
+
+    def _generate_voxels(self) -> None:
+        storage = self.world.storage
+        _voxels = storage.allocate(self.index)
+        if not self.world.store.load(self.position, _voxels):
+            _voxels[:] = 0
+            x, y, z = self.position
+            heights = self.world.height_maps[x, z]
             cx, cy, cz = glm.ivec3(self.position) * CHUNK.SIZE
-            self.generate_terrain(_voxels, cx, cy, cz)
-            self._is_empty = not np.any(_voxels)
-            return _voxels
-        return self.voxels
+            # chunks lying entirely above the terrain of their column stay empty
+            if heights.max() > cy:
+                self.generate_terrain(_voxels, heights, cx, cy, cz, self.world.seed)
+            self.is_dirty = True
+        # full arrays are only kept around once an edit lands
+        storage.compact(self.index)
+        self.update_connectivity()
+        self.is_built = True
+
+    def update_connectivity(self) -> None:
+        # which faces of the chunk air connects, for occlusion culling to look through
+        self.world.connectivity[self.index] = get_face_connectivity(self.index, self.world.storage.arrays)
+        self.world.culler.version += 1
 
     @staticmethod
-    @numba.njit  # type: ignore
-    def generate_terrain(voxels: NDArray[Shape["*, *"], UInt8], cx: int, cy: int, cz: int) -> None:
+    @numba.njit(nogil=True, cache=True)  # type: ignore
+    def generate_terrain(
+        voxels: NDArray[Shape["*, *"], UInt8],
+        heights: NDArray[Shape["*, *"], Int32],
+        cx: int,
+        cy: int,
+        cz: int,
+        seed: NoiseSeed,
+    ) -> None:
         for x in range(CHUNK_SIZE):
             wx = x + cx
             for z in range(CHUNK_SIZE):
                 wz = z + cz
-                world_height = height_map(wx, wz)
+                world_height = heights[x, z]
                 local_height = min(world_height - cy, CHUNK_SIZE)
                 for y in range(local_height):
                     wy = y + cy
-                    set_voxel_id(voxels, (x, y, z), (wx, wy, wz), world_height)
+                    set_voxel_id(voxels, (x, y, z), (wx, wy, wz), world_height, seed)
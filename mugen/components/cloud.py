@@ -1,6 +1,7 @@
 import typing as t
 
 from ..renderer.meshes import CloudMesh
+from ..utils.noise_generator import NoiseSeed
 
 if t.TYPE_CHECKING:
     from mugen import Mugen
@@ -10,12 +11,9 @@ __all__: tuple[str, ...] = ("Clouds",)
 
 
 class Clouds:
-    def __init__(self, app: "Mugen") -> None:
+    def __init__(self, app: "Mugen", seed: NoiseSeed) -> None:
         self.app = app
-        self.cloud_mesh = CloudMesh(self.app)
+        self.cloud_mesh = CloudMesh(self.app, seed)
 
     def render(self) -> None:
         self.cloud_mesh.render()
-
-    def update(self) -> None:
-        self.cloud_mesh.program["uTime"].value = self.app._time  # type: ignore
@@ -0,0 +1,101 @@
+import math
+import typing as t
+
+import numpy as np
+from nptyping import Float32, Int32, Int64, NDArray, Shape, UInt8
+
+from ..utils import CHUNK, WORLD, get_chunk_idx, get_reachable
+from .chunk import LOADED
+
+if t.TYPE_CHECKING:
+    from ..renderer import Camera
+
+
+__all__: tuple[str, ...] = ("ChunkCuller",)
+
+
+class ChunkCuller:
+    # frustum culling over tiles of chunk columns, a tile off the frustum rejects every chunk in it with one test and
+    # the visible set is kept until the camera moves, chunks are placed or unloaded or their connectivity changes
+    def __init__(
+        self,
+        camera: "Camera",
+        centers: NDArray[Shape["*, 3"], Float32],
+        positions: NDArray[Shape["*, 3"], Int32],
+        flags: NDArray[Shape["*"], UInt8],
+        connectivity: NDArray[Shape["*"], Int64],
+        tile: int = WORLD.CULLING_TILE,
+        occlusion: bool = WORLD.OCCLUSION_CULLING,
+    ) -> None:
+        self.camera = camera
+        self.frustum = camera.frustum
+        # arrays of every slot, owned by the world and updated in place
+        self.centers = centers
+        self.positions = positions
+        self.flags = flags
+        self.connectivity = connectivity
+        self.tile = tile
+        self.occlusion = occlusion
+        # bumped whenever a chunk gets new connectivity, workers only ever add to it
+        self.version = 0
+        # slots of the loaded chunks grouped by tile, tile i owns slots[starts[i]:starts[i] + counts[i]]
+        self.slots = np.empty(0, dtype=np.int64)
+        self.starts = np.empty(0, dtype=np.int64)
+        self.counts = np.empty(0, dtype=np.int64)
+        self.tile_centers = np.empty((0, 3), dtype=np.float32)
+        self.tile_radii = np.empty(0, dtype=np.float32)
+        self.is_stale = True
+        # camera the visible set was culled for
+        self._key: tuple[t.Any, ...] | None = None
+        self.visible = np.empty(0, dtype=np.int64)
+
+    def invalidate(self) -> None:
+        # chunks were placed or unloaded, the tiles are regrouped on the next cull
+        self.is_stale = True
+
+    def _build(self) -> None:
+        slots = np.flatnonzero(self.flags & LOADED)
+        tiles = self.positions[slots][:, [0, 2]] // self.tile
+        _, inverse, self.counts = np.unique(tiles, axis=0, return_inverse=True, return_counts=True)
+        order = np.argsort(inverse.ravel(), kind="stable")
+        self.slots, inverse = slots[order], inverse.ravel()[order]
+        self.starts = np.cumsum(self.counts) - self.counts
+        self.is_stale = False
+        if not len(slots):
+            self.tile_centers, self.tile_radii = np.empty((0, 3), dtype=np.float32), np.empty(0, dtype=np.float32)
+            return
+        # spheres around the bounding spheres of the chunks of every tile, with a voxel to spare for rounding
+        centers = self.centers[self.slots]
+        self.tile_centers = (np.minimum.reduceat(centers, self.starts) + np.maximum.reduceat(centers, self.starts)) / 2
+        distances = np.linalg.norm(centers - self.tile_centers[inverse], axis=1)
+        self.tile_radii = np.maximum.reduceat(distances, self.starts) + np.float32(CHUNK.CHUNK_SPHERE_RADIUS + 1)
+
+    def get_visible(self) -> NDArray[Shape["*"], Int64]:
+        # slots of the loaded chunks on the frustum the camera can see into through air, in slot order
+        camera = self.camera
+        key = (self.version, *(tuple(v) for v in (camera.position, camera._front, camera._up, camera._right)))
+        if not self.is_stale and key == self._key:
+            return self.visible
+        if self.is_stale:
+            self._build()
+        self._key = key
+        tiles = np.flatnonzero(self.frustum.get_visible(self.tile_centers, self.tile_radii))
+        # slots of the tiles on the frustum, the work from here on only grows with them
+        counts = self.counts[tiles]
+        runs = np.repeat(self.starts[tiles] - (np.cumsum(counts) - counts), counts)
+        candidates = self.slots[runs + np.arange(len(runs))]
+        self.visible = np.sort(candidates[self.frustum.get_visible(self.centers[candidates])])
+        if self.occlusion:
+            self.visible = self._get_reachable(self.visible)
+        return self.visible
+
+    def _get_reachable(self, visible: NDArray[Shape["*"], Int64]) -> NDArray[Shape["*"], Int64]:
+        # a camera outside the chunk window, above the world or past its edge, has no chunk to search from
+        start = get_chunk_idx(tuple(math.floor(axis) for axis in self.camera.position), self.positions)
+        if start < 0 or not self.flags[start] & LOADED:
+            return visible
+        on_frustum = np.zeros(len(self.flags), dtype=np.bool_)
+        on_frustum[visible] = True
+        on_frustum[start] = True
+        reachable = get_reachable(start, self.positions, self.connectivity, on_frustum)
+        return np.asarray(visible[reachable[visible]])
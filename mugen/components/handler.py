@@ -1,14 +1,21 @@
+import itertools
 import typing as t
 
 import glm
+from nptyping import NDArray, Shape, UInt8
 
-from ..utils import CHUNK, WORLD, get_chunk_idx
+from ..utils import CHUNK
+from ..utils.storage import DENSE
 
 if t.TYPE_CHECKING:
     from .chunk import Chunk
     from .world import World
 
 
+# the voxel itself and every voxel whose faces it can hide or shade through ambient occlusion
+EDIT_REACH = tuple(glm.ivec3(offset) for offset in itertools.product(range(-1, 2), repeat=3))
+
+
 class ChunkManager:
     MAX_RAYCAST_DISTANCE = 8.0  # distance in voxels
 
@@ -26,21 +33,26 @@ class ChunkManager:
 
     def add_voxel(self) -> None:
         if self.voxel_id:
-            voxel_id, voxel_index, _, chunk = self.get_voxel_id(self.voxel_world_pos + self.voxel_normal)
+            voxel_world_pos = self.voxel_world_pos + self.voxel_normal
+            voxel_id, voxel_index, _, chunk = self.get_voxel_id(voxel_world_pos)
             if not voxel_id and chunk is not None:
-                assert chunk.voxels is not None and chunk.mesh is not None, f"Chunk at {chunk.position} is None!"
-                chunk.voxels[voxel_index] = 1
-                chunk.mesh._rebuild()
-                if chunk._is_empty:
-                    chunk._is_empty = False
+                assert chunk.is_built, f"Chunk at {chunk.position} is not built!"
+                self.materialize(chunk)[voxel_index] = 1
+                chunk.is_dirty = True
+                chunk.update_connectivity()
+                self.rebuild_sections(voxel_world_pos)
+                # a chunk without a mesh is skipped above and meshed whole, edit included
+                chunk._build_mesh()
                 self.app.logger.flair(f"Added voxel at {self.voxel_world_pos + self.voxel_normal}!")
 
     def remove_voxel(self) -> None:
         if self.voxel_id and self.chunk is not None:
-            assert self.chunk.voxels is not None and self.chunk.mesh is not None
-            self.chunk.voxels[self.voxel_index] = 0
-            self.chunk.mesh._rebuild()
-            self.rebuild_adjacent_chunks()
+            # ray casts only hit built chunks, whose mesh may still be queued on the pipeline
+            assert self.chunk.is_built, f"Chunk at {self.chunk.position} is not built!"
+            self.materialize(self.chunk)[self.voxel_index] = 0
+            self.chunk.is_dirty = True
+            self.chunk.update_connectivity()
+            self.rebuild_sections(self.voxel_world_pos)
             self.app.logger.flair(f"Removed voxel at {self.voxel_world_pos}!")
 
     def set_voxel(self) -> None:
@@ -56,29 +68,32 @@ class ChunkManager:
     def update(self) -> None:
         self.ray_cast()
 
-    def _rebuild_adjacent_chunks(self, adj_pos: tuple[int, int, int]) -> None:
-        idx = get_chunk_idx(adj_pos)
-        if idx != -1:
-            self.chunks[idx].mesh._rebuild()
-
-    def rebuild_adjacent_chunks(self) -> None:
-        lx, ly, lz = self.voxel_local_pos
-        wx, wy, wz = self.voxel_world_pos
-
-        if lx == 0:
-            self._rebuild_adjacent_chunks((wx - 1, wy, wz))
-        elif lx == CHUNK.SIZE - 1:
-            self._rebuild_adjacent_chunks((wx + 1, wy, wz))
-
-        if ly == 0:
-            self._rebuild_adjacent_chunks((wx, wy - 1, wz))
-        elif ly == CHUNK.SIZE - 1:
-            self._rebuild_adjacent_chunks((wx, wy + 1, wz))
-
-        if lz == 0:
-            self._rebuild_adjacent_chunks((wx, wy, wz - 1))
-        elif lz == CHUNK.SIZE - 1:
-            self._rebuild_adjacent_chunks((wx, wy, wz + 1))
+    def materialize(self, chunk: "Chunk") -> NDArray[Shape["*"], UInt8]:
+        if self.world.storage.arrays.modes[chunk.index] != DENSE:
+            # workers meshing any neighbour may be reading the palette packed rows released here,
+            # their meshes are redone once uploaded
+            for neighbour in self.world.get_neighbours(chunk):
+                neighbour.revision += 1
+        return self.world.storage.materialize(chunk.index)
+
+    def rebuild_sections(self, voxel_world_pos: glm.ivec3) -> None:
+        # only the sections holding a voxel next to the edited one are remeshed, in this chunk and its neighbours
+        chunks: set["Chunk"] = set()
+        for offset in EDIT_REACH:
+            position = voxel_world_pos + offset
+            chunk_pos = glm.ivec3(glm.floor(glm.vec3(position) / CHUNK.SIZE))
+            chunk = self.world.get_chunk(tuple(chunk_pos))  # type: ignore
+            if chunk is None:
+                continue
+            if chunk.mesh is None:
+                # a mesh still on the pipeline was started before the edit, it is meshed again on upload
+                chunk.revision += 1
+                continue
+            chunk.mesh.dirty[(position.y - chunk_pos.y * CHUNK.SIZE) // CHUNK.SECTION_HEIGHT] = True
+            chunks.add(chunk)
+        for chunk in chunks:
+            chunk.revision += 1
+            chunk.mesh.rebuild_dirty()  # type: ignore
 
     @staticmethod
     def _delta(x: float, y: float) -> tuple[float, float, float]:
@@ -90,7 +105,8 @@ class ChunkManager:
     def ray_cast(self) -> bool:
         x1, y1, z1 = self.app._player.position
         x2, y2, z2 = self.app._player.position + self.app._player._front * self.MAX_RAYCAST_DISTANCE
-        current_voxel_pos = glm.ivec3(x1, y1, z1)
+        # floor rather than truncate, the streamed world reaches into negative coordinates
+        current_voxel_pos = glm.ivec3(glm.floor(self.app._player.position))
 
         step_dir = -1
         self.voxel_id = 0
@@ -131,14 +147,13 @@ class ChunkManager:
         return False
 
     def get_voxel_id(self, voxel_world_pos: glm.ivec3) -> tuple[int, int, glm.ivec3, t.Optional["Chunk"]]:
-        cx, cy, cz = chunk_pos = voxel_world_pos / CHUNK.SIZE
-        if 0 <= cx < WORLD.WIDTH and 0 <= cy < WORLD.HEIGHT and 0 <= cz < WORLD.DEPTH:
-            chunk_idx = cx + WORLD.WIDTH * cz + WORLD.AREA * cy
-            chunk = self.chunks[chunk_idx]
-            assert chunk is not None and chunk.voxels is not None, f"Chunk at {chunk_pos} is None!"
+        chunk_pos = glm.ivec3(glm.floor(glm.vec3(voxel_world_pos) / CHUNK.SIZE))
+        chunk = self.world.get_chunk(tuple(chunk_pos))  # type: ignore
+        # chunks still waiting on the pipeline are treated like empty space
+        if chunk is not None and chunk.is_built:
             lx, ly, lz = local_pos = voxel_world_pos - chunk_pos * CHUNK.SIZE
             voxel_idx = lx + lz * CHUNK.SIZE + ly * CHUNK.AREA
-            voxel_id = chunk.voxels[voxel_idx]
+            voxel_id = self.world.storage.get(chunk.index, voxel_idx)
             return voxel_id, voxel_idx, local_pos, chunk
         return 0, 0, glm.ivec3(0, 0, 0), None
 
@@ -156,7 +171,7 @@ class ChunkManager:
 
         x2, y2, z2 = self.app._player.position + dir_map[direction] * 3.0
 
-        current_voxel_pos = glm.ivec3(x1, y1, z1)
+        current_voxel_pos = glm.ivec3(glm.floor(self.app._player.position))
 
         dx, delta_x, max_x = self._delta(x1, x2)
         dy, delta_y, max_y = self._delta(y1, y2)
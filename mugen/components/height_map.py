@@ -0,0 +1,42 @@
+import collections
+import threading
+
+import numpy as np
+from nptyping import Int32, NDArray, Shape
+
+from ..utils import CHUNK, WORLD
+from ..utils.noise_generator import NoiseSeed, column_height_map
+
+__all__: tuple[str, ...] = ("HeightMapCache",)
+
+
+class HeightMapCache:
+    def __init__(self, seed: NoiseSeed, capacity: int = WORLD.HEIGHT_MAP_CACHE_SIZE) -> None:
+        self.seed = seed
+        self.capacity = capacity
+        self._height_maps: collections.OrderedDict[
+            tuple[int, int], NDArray[Shape["*, *"], Int32]
+        ] = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+    def __getitem__(self, position: tuple[int, int]) -> NDArray[Shape["*, *"], Int32]:
+        with self._lock:
+            if position in self._height_maps:
+                self._height_maps.move_to_end(position)
+                return self._height_maps[position]
+        heights = np.empty((CHUNK.SIZE, CHUNK.SIZE), dtype=np.int32)
+        x, z = position
+        column_height_map(heights, x * CHUNK.SIZE, z * CHUNK.SIZE, self.seed)
+        heights.flags.writeable = False
+        with self._lock:
+            self._height_maps[position] = heights
+            if len(self._height_maps) > self.capacity:
+                self._height_maps.popitem(last=False)
+        return heights
+
+    def __len__(self) -> int:
+        return len(self._height_maps)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._height_maps.clear()
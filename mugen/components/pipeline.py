@@ -0,0 +1,111 @@
+import itertools
+import queue
+import threading
+import time
+import typing as t
+
+import glm
+from nptyping import NDArray, Shape, UInt32
+
+from ..renderer.meshes import ChunkMesh
+from ..utils import WORLD
+from .chunk import FAILED
+
+if t.TYPE_CHECKING:
+    from .chunk import Chunk
+    from .world import World
+
+
+__all__: tuple[str, ...] = ("ChunkPipeline",)
+
+
+class ChunkPipeline:
+    def __init__(
+        self,
+        world: "World",
+        workers: int = WORLD.PIPELINE_WORKERS,
+        time_budget: float = WORLD.UPLOAD_TIME_BUDGET,
+        byte_budget: int = WORLD.UPLOAD_BYTE_BUDGET,
+    ) -> None:
+        self.world = world
+        self.app = world.app
+        self.time_budget = time_budget
+        self.byte_budget = byte_budget
+        # chunks queued or being worked on, only touched by the main thread
+        self.pending: set["Chunk"] = set()
+        self._jobs: queue.PriorityQueue[tuple[float, int, t.Optional["Chunk"]]] = queue.PriorityQueue()
+        self._results: queue.SimpleQueue[
+            tuple["Chunk", int, int, list[NDArray[Shape["*"], UInt32]] | None]
+        ] = queue.SimpleQueue()
+        self._order = itertools.count()
+        self._threads = [
+            threading.Thread(target=self._work, name=f"ChunkWorker-{i}", daemon=True) for i in range(max(workers, 1))
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def request(self, chunk: "Chunk") -> None:
+        if chunk in self.pending:
+            return
+        self.pending.add(chunk)
+        # nearest chunks first
+        priority = glm.distance2(chunk.center, self.app._player.position)
+        self._jobs.put((priority, next(self._order), chunk))
+
+    def _work(self) -> None:
+        while (job := self._jobs.get()[2]) is not None:
+            # the world bumps the revision when it changes the level of detail of a chunk
+            revision, lod = job.revision, job.lod
+            vertex_data = None
+            try:
+                # faces on the chunk borders depend on the voxels of every surrounding chunk
+                for chunk in (*self.world.get_neighbours(job), job):
+                    chunk._build_voxels()
+                if job.is_loaded:
+                    vertex_data = ChunkMesh.get_vertex_data(job, lod=lod)
+            except Exception as e:
+                self.app.logger.error(f"Failed to build chunk at {job.position}: {e!r}")
+            self._results.put((job, revision, lod, vertex_data))
+
+    def upload(self, time_budget: float | None = None, byte_budget: int | None = None) -> int:
+        time_budget = self.time_budget if time_budget is None else time_budget
+        byte_budget = self.byte_budget if byte_budget is None else byte_budget
+        start = time.perf_counter()
+        uploaded = nbytes = 0
+        # at least one mesh per frame, so a single huge mesh can not stall the queue
+        while not uploaded or (nbytes < byte_budget and time.perf_counter() - start < time_budget):
+            try:
+                chunk, revision, lod, vertex_data = self._results.get_nowait()
+            except queue.Empty:
+                break
+            self.pending.discard(chunk)
+            if not chunk.is_loaded:
+                continue
+            if vertex_data is None:
+                # the worker logged the error, the chunk is not requested again until its slot is reused
+                self.world.flags[chunk.index] |= FAILED
+                continue
+            if chunk.revision != revision:
+                # voxels around the chunk changed while it was being meshed
+                self.request(chunk)
+                continue
+            if chunk.mesh is None:
+                chunk._build_mesh(vertex_data, lod)
+            else:
+                chunk.mesh._rebuild(vertex_data, lod)
+            uploaded += 1
+            nbytes += sum(vertices.nbytes for vertices in vertex_data)
+        return uploaded
+
+    def finish(self) -> None:
+        # block until every requested chunk is uploaded, ignoring the frame budget
+        while self.pending:
+            if not self.upload(time_budget=float("inf"), byte_budget=2**63 - 1):
+                time.sleep(0.001)
+
+    def close(self) -> None:
+        # stop sentinels go ahead of every queued job, workers only finish the chunk they are on
+        for _ in self._threads:
+            self._jobs.put((float("-inf"), next(self._order), None))
+        for thread in self._threads:
+            thread.join()
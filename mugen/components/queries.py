@@ -0,0 +1,66 @@
+import typing as t
+
+import moderngl
+import numpy as np
+from nptyping import Bool, Float32, Int64, NDArray, Shape
+
+from ..utils import CAMERA, CHUNK, WORLD
+
+if t.TYPE_CHECKING:
+    from mugen import Mugen
+
+
+__all__: tuple[str, ...] = ("OcclusionQueries",)
+
+
+class OcclusionQueries:
+    # bounding boxes of the chunks on the frustum are drawn against the depth of the terrain every frame, a chunk no
+    # sample of its box passed for is left out, results are only read QUERY_LATENCY frames later so the cpu never
+    # waits on frames the gpu has not finished
+    def __init__(self, app: "Mugen", centers: NDArray[Shape["*, 3"], Float32]) -> None:
+        self.ctx = app.ctx
+        self.camera = app._player
+        # array of every slot, owned by the world and updated in place
+        self.centers = centers
+        self.program = app.shader.get_program("BOUNDS")
+        self.origin = t.cast(moderngl.Uniform, self.program["uOrigin"])
+        self.vao = self.ctx.vertex_array(self.program, [])
+        # queries and queried slots of each frame in flight, a frame reuses the ones read at its start
+        self.queries: list[dict[int, moderngl.Query]] = [{} for _ in range(WORLD.QUERY_LATENCY)]
+        self.pending: list[NDArray[Shape["*"], Int64] | None] = [None] * WORLD.QUERY_LATENCY
+        self.frame = 0
+        # slots whose box had no visible samples, every slot that was not queried counts as visible
+        self.hidden = np.zeros(WORLD.VOLUME, dtype=np.bool_)
+
+    def resolve(self) -> NDArray[Shape["*"], Bool]:
+        # moderngl can not tell whether a result is available, reading one the gpu has not written yet would block,
+        # until the oldest frame in flight was queried the last result is kept
+        batch = self.frame % WORLD.QUERY_LATENCY
+        if (pending := self.pending[batch]) is not None:
+            self.hidden[:] = False
+            for index in pending:
+                self.hidden[index] = not self.queries[batch][index].samples
+            self.pending[batch] = None
+        return self.hidden
+
+    def run(self, slots: NDArray[Shape["*"], Int64]) -> None:
+        # the box of the chunk the camera is in would be clipped by the near plane, it is always drawn
+        reach = np.float32(CHUNK.H_SIZE + WORLD.QUERY_MARGIN + CAMERA.NEAR)
+        outside = np.any(np.abs(self.centers[slots] - np.array(self.camera.position)) > reach, axis=1)
+        batch = self.frame % WORLD.QUERY_LATENCY
+        self.frame += 1
+        pending = self.pending[batch] = slots[outside]
+        queries = self.queries[batch]
+        # the masks go on the framebuffer bound when the terrain was drawn, which moderngl may not know about
+        fbo = self.ctx.detect_framebuffer()
+        fbo.use()
+        fbo.color_mask, fbo.depth_mask = (False, False, False, False), False
+        self.ctx.disable(moderngl.CULL_FACE)
+        for index, center in zip(pending, self.centers[pending]):
+            if (query := queries.get(index)) is None:
+                query = queries[index] = self.ctx.query(samples=True)
+            self.origin.value = tuple(center - np.float32(CHUNK.H_SIZE + WORLD.QUERY_MARGIN))
+            with query:
+                self.vao.render(moderngl.TRIANGLE_STRIP, vertices=14)
+        self.ctx.enable(moderngl.CULL_FACE)
+        fbo.color_mask, fbo.depth_mask = (True, True, True, True), True
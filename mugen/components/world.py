@@ -1,11 +1,19 @@
+import concurrent.futures
 import itertools
 import typing as t
 
+import glm
 import numpy as np
 
-from ..utils import CHUNK, WORLD
-from .chunk import Chunk
+from ..renderer.meshes import ChunkMesh, VertexArena
+from ..utils import ALL_FACES, CHUNK, WORLD, RegionStore, VoxelStorage, tracer
+from ..utils.noise_generator import NoiseSeed
+from .chunk import LOADED, Chunk
+from .culling import ChunkCuller
 from .handler import ChunkManager
+from .height_map import HeightMapCache
+from .pipeline import ChunkPipeline
+from .queries import OcclusionQueries
 
 if t.TYPE_CHECKING:
     from mugen import Mugen
@@ -14,38 +22,208 @@ if t.TYPE_CHECKING:
 __all__: tuple[str, ...] = ("World",)
 
 
+_T = t.TypeVar("_T")
+_R = t.TypeVar("_R")
+
+NEIGHBOUR_OFFSETS = tuple(offset for offset in itertools.product(range(-1, 2), repeat=3) if offset != (0, 0, 0))
+
+
 class World:
-    def __init__(self, app: "Mugen") -> None:
+    def __init__(
+        self,
+        app: "Mugen",
+        workers: int = WORLD.WORKERS,
+        store: RegionStore | None = None,
+        memmap: bool = WORLD.MEMMAP_VOXELS,
+        streaming: bool = WORLD.STREAMING,
+        occlusion_queries: bool = WORLD.OCCLUSION_QUERIES,
+    ) -> None:
         self.app = app
+        self.workers = workers
+        self.streaming = streaming
+        self.store = store if store is not None else RegionStore(WORLD.SAVE_DIR)
         self.chunks: list[Chunk | None] = [None] * WORLD.VOLUME
-        self.voxels = np.empty([WORLD.VOLUME, CHUNK.VOLUME], dtype=np.uint8)
-        self._build_chunks()
-        self._build_meshes()
+        # level of detail of the chunk in every slot, 0 is full detail and every level halves the resolution
+        self.lods = np.zeros(WORLD.VOLUME, dtype=np.int8)
+        # what the frame needs of every slot, so culling and drawing never touch the chunk objects
+        self.centers = np.zeros((WORLD.VOLUME, 3), dtype=np.float32)
+        self.flags = np.zeros(WORLD.VOLUME, dtype=np.uint8)
+        # indirect draw of the mesh in every slot, empty meshes and chunks draw 0 vertices
+        self.commands = np.zeros((WORLD.VOLUME, 5), dtype=np.uint32)
+        # faces of every chunk air connects, chunks not generated yet could be open anywhere
+        self.connectivity = np.full(WORLD.VOLUME, ALL_FACES, dtype=np.int64)
+        self.storage = VoxelStorage(WORLD.VOLUME, memmap_dir=self.store.directory if memmap else None)
+        self.culler: ChunkCuller = ChunkCuller(
+            self.app._player, self.centers, self.storage.arrays.positions, self.flags, self.connectivity
+        )
+        self.queries = OcclusionQueries(self.app, self.centers) if occlusion_queries else None
+        # terrain always follows the seed of the store it is saved to
+        self.seed: NoiseSeed = NoiseSeed.from_seed(self.store.seed)
+        self.height_maps: HeightMapCache = HeightMapCache(self.seed)
+        self.origin = self._get_origin()
+        self.index_buffer = ChunkMesh.get_index_buffer(self.app.ctx)
+        self.vertex_arena: VertexArena = ChunkMesh.get_vertex_arena(
+            self.app.ctx, self.app.shader.get_program("CHUNK"), self.index_buffer
+        )
+        with tracer.span("chunks"):
+            self._build_chunks()
+        with tracer.span("meshes"):
+            self._build_meshes()
+        self.pipeline = ChunkPipeline(world=self)
         self.chunk_manager = ChunkManager(world=self)
 
+    def _map(self, func: t.Callable[[_T], _R], items: t.Iterable[_T]) -> list[_R]:
+        # the terrain and meshing kernels release the GIL, so plain threads run them on every core
+        if self.workers <= 1:
+            return list(map(func, items))
+        with concurrent.futures.ThreadPoolExecutor(max_workers=self.workers) as pool:
+            return list(pool.map(func, items))
+
     def _build_meshes(self) -> None:
-        for chunk in self.chunks:
-            if chunk is not None and chunk.is_on_frustum(chunk):
-                chunk._build_mesh()
+        chunks = [chunk for chunk in self.chunks if chunk is not None and chunk.is_on_frustum(chunk)]
+        with tracer.span("mesh"):
+            vertices = self._map(lambda chunk: ChunkMesh.get_vertex_data(chunk, lod=chunk.lod), chunks)
+        with tracer.span("upload"):
+            for chunk, vertex_data in zip(chunks, vertices):
+                chunk._build_mesh(vertex_data, chunk.lod)
 
     def _build_chunks(self) -> None:
-        for x, y, z in itertools.product(range(WORLD.WIDTH), range(WORLD.HEIGHT), range(WORLD.DEPTH)):
-            chunk = Chunk(world=self, app=self.app, position=(x, y, z))
-            chunk_idx = x + WORLD.WIDTH * z + WORLD.AREA * y
-            self.chunks[chunk_idx] = chunk
-            if chunk.is_on_frustum(chunk):
-                self.voxels[chunk_idx] = chunk._build_voxels()
-                chunk.voxels = self.voxels[chunk_idx]
+        for position in self._get_window():
+            self._place_chunk(position)
+        chunks = [chunk for chunk in self.chunks if chunk is not None and chunk.is_on_frustum(chunk)]
+        # the startup meshes read the borders of their neighbours, on the frustum or not
+        neighbours = [neighbour for chunk in chunks for neighbour in self.get_neighbours(chunk)]
+        self._build_voxels(list(dict.fromkeys(chunks + neighbours)))
+
+    def _build_voxels(self, chunks: list[Chunk]) -> None:
+        missing = (chunk.position for chunk in chunks if chunk.position not in self.store)
+        with tracer.span("height maps"):
+            self._map(self.height_maps.__getitem__, {(x, z) for x, _, z in missing})
+        with tracer.span("terrain"):
+            self._map(Chunk._build_voxels, chunks)
+
+    def _get_origin(self) -> tuple[int, int]:
+        if not self.streaming:
+            return 0, 0
+        # lowest chunk column of the window centered on the player
+        x, _, z = self.app._player.position
+        return int(x // CHUNK.SIZE) - WORLD.WIDTH // 2, int(z // CHUNK.SIZE) - WORLD.DEPTH // 2
+
+    def _get_window(self) -> t.Iterator[tuple[int, int, int]]:
+        ox, oz = self.origin
+        return itertools.product(range(ox, ox + WORLD.WIDTH), range(WORLD.HEIGHT), range(oz, oz + WORLD.DEPTH))
+
+    def get_chunk(self, position: tuple[int, int, int]) -> Chunk | None:
+        x, y, z = position
+        if not 0 <= y < WORLD.HEIGHT:
+            return None
+        chunk = self.chunks[x % WORLD.WIDTH + WORLD.WIDTH * (z % WORLD.DEPTH) + WORLD.AREA * y]
+        return chunk if chunk is not None and chunk.position == position else None
+
+    def get_neighbours(self, chunk: Chunk) -> list[Chunk]:
+        x, y, z = chunk.position
+        neighbours = (self.get_chunk((x + dx, y + dy, z + dz)) for dx, dy, dz in NEIGHBOUR_OFFSETS)
+        return [neighbour for neighbour in neighbours if neighbour is not None]
+
+    def _place_chunk(self, position: tuple[int, int, int]) -> Chunk:
+        chunk = Chunk(world=self, app=self.app, position=position)
+        if (previous := self.chunks[chunk.index]) is not None:
+            self._unload_chunk(previous)
+        self.chunks[chunk.index] = chunk
+        self.storage.assign(chunk.index, position)
+        self.centers[chunk.index] = chunk.center
+        self.flags[chunk.index] = LOADED
+        self.culler.invalidate()
+        distance = glm.distance(chunk.center, self.app._player.position)
+        self.lods[chunk.index] = np.searchsorted(CHUNK.LOD_DISTANCES, distance)
+        return chunk
+
+    def _unload_chunk(self, chunk: Chunk) -> None:
+        # waits for a worker still building the chunk
+        chunk._unload()
+        if chunk.is_built and chunk.is_dirty:
+            self.store.save(chunk.position, self.storage.decode(chunk.index))
+        if chunk.mesh is not None:
+            chunk.mesh.release()
+            chunk.mesh = None
+        self.storage.release(chunk.index)
+        self.chunks[chunk.index] = None
+        self.flags[chunk.index] = 0
+        self.connectivity[chunk.index] = ALL_FACES
+        self.culler.invalidate()
+
+    def _stream(self) -> None:
+        origin = self._get_origin()
+        if origin == self.origin:
+            return
+        self.origin = origin
+        # slots of columns that left the window are taken over by the columns entering it
+        entered = [self._place_chunk(position) for position in self._get_window() if self.get_chunk(position) is None]
+        # meshes next to the new chunks, built or still on the pipeline, read their borders as missing neighbours
+        positions = {chunk.position for chunk in entered}
+        neighbours = {(x + dx, y + dy, z + dz) for x, y, z in positions for dx, dy, dz in NEIGHBOUR_OFFSETS}
+        for position in neighbours - positions:
+            chunk = self.get_chunk(position)
+            if chunk is None:
+                continue
+            chunk.revision += 1
+            # queued meshes are requested again on upload, chunks without one are requested by the frame
+            if chunk.mesh is not None:
+                self.pipeline.request(chunk)
+        self.app.logger.debug(f"Streamed in {len(entered)} chunks around {origin}.")
+
+    def _update_lods(self) -> None:
+        distances = np.linalg.norm(self.centers - np.array(self.app._player.position), axis=1)
+        thresholds = np.array(CHUNK.LOD_DISTANCES)
+        # a level is only left once the distance is LOD_HYSTERESIS past the threshold on either side of it
+        lods = np.clip(
+            self.lods,
+            np.searchsorted(thresholds + CHUNK.LOD_HYSTERESIS, distances),
+            np.searchsorted(thresholds - CHUNK.LOD_HYSTERESIS, distances),
+        )
+        for index in np.flatnonzero(lods != self.lods):
+            self.lods[index] = lods[index]
+            chunk = self.chunks[index]
+            if chunk is not None and chunk.mesh is not None:
+                chunk.revision += 1
+                self.pipeline.request(chunk)
 
     def render(self) -> None:
-        for chunk in self.chunks:
-            if chunk is not None:
-                if chunk.voxels is None:
-                    x, y, z = chunk.position
-                    chunk_idx = x + WORLD.WIDTH * z + WORLD.AREA * y
-                    self.voxels[chunk_idx] = chunk._build_voxels()
-                    chunk.voxels = self.voxels[chunk_idx]
-                chunk.render()
+        self.pipeline.upload()
+        on_frustum = self.culler.get_visible()
+        # chunks are generated and meshed by the pipeline, the frame only draws what is ready
+        for index in on_frustum[self.flags[on_frustum] == LOADED]:
+            chunk = self.chunks[index]
+            assert chunk is not None
+            self.pipeline.request(chunk)
+        if self.queries is not None:
+            on_frustum = on_frustum[~self.queries.resolve()[on_frustum]]
+        # every visible chunk in a single indirect draw
+        commands = self.commands[on_frustum]
+        self.vertex_arena.render(commands[commands[:, 0] > 0])
+
+    def query_occlusion(self) -> None:
+        # after everything that hides terrain is drawn, chunks hidden behind it are found for the next frame
+        if self.queries is not None:
+            on_frustum = self.culler.get_visible()
+            self.queries.run(on_frustum[self.commands[on_frustum, 0] > 0])
+
+    def save(self) -> None:
+        dirty = [chunk for chunk in self.chunks if chunk is not None and chunk.is_built and chunk.is_dirty]
+        for chunk in dirty:
+            self.store.save(chunk.position, self.storage.decode(chunk.index))
+            chunk.is_dirty = False
+        self.store.flush()
+        self.app.logger.info(f"Saved {len(dirty)} chunks to '{self.store.directory}'.")
+
+    def close(self) -> None:
+        # workers are joined first, chunks they built while shutting down are saved with the rest
+        self.pipeline.close()
+        self.save()
+        self.store.close()
 
     def update(self) -> None:
+        if self.streaming:
+            self._stream()
+        self._update_lods()
         self.chunk_manager.update()
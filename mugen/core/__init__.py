@@ -1,3 +1,7 @@
 from .engine import Mugen
+from .warmup import warmup
 
-__all__: tuple[str, ...] = ("Mugen",)
+__all__: tuple[str, ...] = (
+    "Mugen",
+    "warmup",
+)
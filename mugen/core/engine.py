@@ -8,7 +8,7 @@ with contextlib.redirect_stdout(None):
 import moderngl
 
 from ..renderer import Scene, Shader, Textures
-from ..utils import WINDOW, Logger
+from ..utils import WINDOW, Logger, tracer
 from .player import Player
 
 __all__: tuple[str, ...] = ("Mugen",)
@@ -20,25 +20,28 @@ class Mugen:
 
     def __init__(self) -> None:
         self._logger.info("Initializing Mugen...")
-        pygame.init()
-        pygame.display.gl_set_attribute(pygame.GL_CONTEXT_MAJOR_VERSION, 3)
-        pygame.display.gl_set_attribute(pygame.GL_CONTEXT_MINOR_VERSION, 3)
-        pygame.display.gl_set_attribute(pygame.GL_CONTEXT_PROFILE_MASK, pygame.GL_CONTEXT_PROFILE_CORE)
-        pygame.display.gl_set_attribute(pygame.GL_DEPTH_SIZE, 24)
-        pygame.display.gl_set_attribute(pygame.GL_DOUBLEBUFFER, 1)
-        pygame.display.gl_set_attribute(pygame.GL_MULTISAMPLEBUFFERS, 1)
-        pygame.display.gl_set_attribute(pygame.GL_MULTISAMPLESAMPLES, 4)
-        pygame.event.set_grab(True)
-        pygame.mouse.set_visible(False)
-
-        self.window = pygame.display.set_mode(
-            WINDOW.RESOLUTION, flags=pygame.DOUBLEBUF | pygame.OPENGL | pygame.RESIZABLE
-        )
-        pygame.display.set_caption(WINDOW.TITLE)
-        pygame.display.set_icon(pygame.image.load(WINDOW.ICON))
+        with tracer.span("window"):
+            pygame.init()
+            # multi draw indirect with a base instance draws every chunk at once
+            pygame.display.gl_set_attribute(pygame.GL_CONTEXT_MAJOR_VERSION, 4)
+            pygame.display.gl_set_attribute(pygame.GL_CONTEXT_MINOR_VERSION, 3)
+            pygame.display.gl_set_attribute(pygame.GL_CONTEXT_PROFILE_MASK, pygame.GL_CONTEXT_PROFILE_CORE)
+            pygame.display.gl_set_attribute(pygame.GL_DEPTH_SIZE, 24)
+            pygame.display.gl_set_attribute(pygame.GL_DOUBLEBUFFER, 1)
+            pygame.display.gl_set_attribute(pygame.GL_MULTISAMPLEBUFFERS, 1)
+            pygame.display.gl_set_attribute(pygame.GL_MULTISAMPLESAMPLES, 4)
+            pygame.event.set_grab(True)
+            pygame.mouse.set_visible(False)
+
+            self.window = pygame.display.set_mode(
+                WINDOW.RESOLUTION, flags=pygame.DOUBLEBUF | pygame.OPENGL | pygame.RESIZABLE
+            )
+            pygame.display.set_caption(WINDOW.TITLE)
+            pygame.display.set_icon(pygame.image.load(WINDOW.ICON))
         self._logger.info("Initialized pygame window.")
 
-        self.ctx = moderngl.create_context()
+        with tracer.span("gl context"):
+            self.ctx = moderngl.create_context(require=430)
         self.ctx.gc_mode = "auto"
         self.ctx.blend_func = moderngl.SRC_ALPHA, moderngl.ONE_MINUS_SRC_ALPHA
         self.ctx.enable(flags=moderngl.BLEND | moderngl.CULL_FACE | moderngl.DEPTH_TEST)
@@ -48,10 +51,13 @@ class Mugen:
         self._delta_time = 0.0
         self._time = 0.0
         self._is_running = True
-        self._textures = Textures(app=self)
+        with tracer.span("textures"):
+            self._textures = Textures(app=self)
         self._player = Player(app=self)
-        self._shader = Shader(app=self)
-        self._scene = Scene(app=self)
+        with tracer.span("shaders"):
+            self._shader = Shader(app=self)
+        with tracer.span("scene"):
+            self._scene = Scene(app=self)
 
         self._logger.info("Initialized Mugen...")
 
@@ -64,7 +70,11 @@ class Mugen:
         self._time += self._delta_time
         pygame.display.set_caption(f"{WINDOW.TITLE} | FPS: {self.clock.get_fps():.2f}")
         time_running = pygame.time.get_ticks() / 1000.0 - self._start_time
-        self._logger.debug(f"FPS: {self.clock.get_fps():.2f} | Total time: {time_running:.2f}s")
+        arena = self._scene.world.vertex_arena
+        self._logger.debug(
+            f"FPS: {self.clock.get_fps():.2f} | Total time: {time_running:.2f}s | "
+            f"Chunk arena: {arena.live_bytes / 2**20:.1f} of {arena.size / 2**20:.1f} MiB live"
+        )
 
     def render(self) -> None:
         self.ctx.clear(0.58, 0.83, 0.99)
@@ -76,17 +86,26 @@ class Mugen:
             self._is_running = False
         self._player.event_listener(event)
 
+    def step(self) -> None:
+        for event in pygame.event.get():
+            self.event_handler(event)
+        self.update()
+        self.render()
+
     def run(self) -> None:
         try:
+            # the first frame uploads the startup meshes, it closes the startup trace
+            with tracer.span("first frame"):
+                self.step()
+            if report := tracer.stop():
+                self._logger.info(f"Startup trace:\n{report}")
             while self._is_running:
-                for event in pygame.event.get():
-                    self.event_handler(event)
-                self.update()
-                self.render()
+                self.step()
         except Exception as e:
             tb_str = "".join(traceback.format_exception(type(e), e, e.__traceback__))
             self._logger.error(f"Exception occurred: {tb_str}")
         finally:
+            self._scene.world.close()
             pygame.quit()
             sys.exit()
 
@@ -0,0 +1,64 @@
+import time
+
+import numpy as np
+
+from ..components import Chunk
+from ..components.height_map import HeightMapCache
+from ..renderer.meshes import ChunkMesh, CloudMesh
+from ..utils import (
+    ALL_FACES,
+    CHUNK,
+    WORLD,
+    Logger,
+    VoxelStorage,
+    build_chunk_mesh,
+    build_greedy_chunk_mesh,
+    build_lod_chunk_mesh,
+    fingerprint,
+    get_chunk_idx,
+    get_face_connectivity,
+    get_reachable,
+    prune_cache,
+)
+from ..utils.jit import CACHE_DIR
+from ..utils.noise_generator import NoiseSeed
+
+__all__: tuple[str, ...] = ("warmup",)
+
+
+def warmup(logger: Logger) -> None:
+    # runs every kernel once with the argument types the game passes, so each lands in the persistent cache
+    start = time.perf_counter()
+    logger.info(f"Compiling kernels into '{CACHE_DIR}'...")
+    seed = NoiseSeed.from_seed(WORLD.SEED)
+
+    heights = HeightMapCache(seed)[WORLD.WIDTH // 2, WORLD.DEPTH // 2]
+    storage = VoxelStorage(WORLD.VOLUME)
+    position = (WORLD.WIDTH // 2, 0, WORLD.DEPTH // 2)
+    index = position[0] + WORLD.WIDTH * position[2]
+    storage.assign(index, position)
+    voxels = storage.allocate(index)
+    voxels[:] = 0
+    Chunk.generate_terrain(voxels, heights, position[0] * CHUNK.SIZE, 0, position[2] * CHUNK.SIZE, seed)
+    storage.compact(index)
+    storage.decode(index)
+    for mesher in (build_chunk_mesh, build_greedy_chunk_mesh):
+        mesher(index, position, storage.arrays, ChunkMesh.get_scratch(), 0, CHUNK.SECTION_HEIGHT)
+    build_lod_chunk_mesh(index, position, storage.arrays, ChunkMesh.get_scratch(), 2)
+    get_face_connectivity(index, storage.arrays)
+    storage.materialize(index)
+    for mesher in (build_chunk_mesh, build_greedy_chunk_mesh):
+        mesher(index, position, storage.arrays, ChunkMesh.get_scratch(), 0, CHUNK.SECTION_HEIGHT)
+    build_lod_chunk_mesh(index, position, storage.arrays, ChunkMesh.get_scratch(), 2)
+    get_chunk_idx(position, storage.arrays.positions)
+    get_face_connectivity(index, storage.arrays)
+    connectivity = np.full(WORLD.VOLUME, ALL_FACES, dtype=np.int64)
+    get_reachable(index, storage.arrays.positions, connectivity, np.ones(WORLD.VOLUME, dtype=np.bool_))
+
+    cloud_data = np.zeros(WORLD.AREA * CHUNK.AREA, dtype=np.uint8)
+    CloudMesh.gen_clouds(cloud_data, seed)
+    CloudMesh.build_mesh(cloud_data)
+
+    for path in prune_cache():
+        logger.info(f"Removed stale kernel cache '{path}'.")
+    logger.info(f"Compiled kernels for source fingerprint {fingerprint()} in {time.perf_counter() - start:.2f}s.")
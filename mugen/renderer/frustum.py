@@ -2,6 +2,8 @@ import math
 import typing as t
 
 import glm
+import numpy as np
+from nptyping import Bool, Float32, NDArray, Shape
 
 from ..utils import CAMERA, CHUNK
 
@@ -35,3 +37,19 @@ class Frustum:
         if not (-dist <= sx < dist):
             return False
         return True
+
+    def get_visible(
+        self,
+        centers: NDArray[Shape["*, 3"], Float32],
+        radii: float | NDArray[Shape["*"], Float32] = CHUNK.CHUNK_SPHERE_RADIUS,
+    ) -> NDArray[Shape["*"], Bool]:
+        # `is_on_frustum` for the bounding spheres of many chunks at once, or of larger spheres around groups of them
+        sphere_vecs = centers - np.array(self.camera.position, dtype=np.float32)
+        axes = np.array((self.camera._front, self.camera._up, self.camera._right), dtype=np.float32)
+        sz, sy, sx = (sphere_vecs @ axes.T).T
+        visible = (CAMERA.NEAR - radii <= sz) & (sz < CAMERA.FAR + radii)
+        dist = self.factor_y * radii + sz * self.tan_y
+        visible &= (-dist <= sy) & (sy < dist)
+        dist = self.factor_x * radii + sz * self.tan_x
+        visible &= (-dist <= sx) & (sx < dist)
+        return visible  # type: ignore
@@ -17,6 +17,8 @@ class VoxelMarker:
         self.app = chunk_manager.app
         self.position = glm.ivec3(0, 0, 0)
         self.mesh = CubeMesh(self.app)
+        self.mode = self.mesh.program["uMode"]
+        self.model = self.mesh.program["uModel"]
 
     def update(self) -> None:
         if self.chunk_manager.voxel_id:
@@ -26,8 +28,8 @@ class VoxelMarker:
                 self.position = self.chunk_manager.voxel_world_pos
 
     def set_uniform(self) -> None:
-        self.mesh.program["uMode"].value = 1 if self.chunk_manager.mode == "add" else 0  # type: ignore
-        self.mesh.program["uModel"].write(self.model_matrix)  # type: ignore
+        self.mode.value = 1 if self.chunk_manager.mode == "add" else 0  # type: ignore
+        self.model.write(self.model_matrix)  # type: ignore
 
     def render(self) -> None:
         if self.chunk_manager.voxel_id:
@@ -1,3 +1,4 @@
+from .arena import VertexArena
 from .chunk import ChunkMesh
 from .cloud import CloudMesh
 from .cube import CubeMesh
@@ -10,4 +11,5 @@ __all__: tuple[str, ...] = (
     "CubeMesh",
     "CloudMesh",
     "WaterMesh",
+    "VertexArena",
 )
@@ -0,0 +1,119 @@
+import bisect
+
+import moderngl
+import numpy as np
+from nptyping import NDArray, Shape, UInt32
+
+from ...utils import CHUNK, WORLD
+
+__all__: tuple[str, ...] = ("VertexArena",)
+
+
+# glDrawElementsIndirect commands: count, instance count, first index, base vertex, base instance
+COMMAND_SIZE = 5 * 4
+
+
+class VertexArena:
+    # one buffer every chunk mesh is sub-allocated from, so all visible chunks are drawn by a single indirect call,
+    # the vertex shader reads the faces out of it as a storage buffer and the base instance of a draw picks the
+    # origin of its chunk out of a per-instance attribute
+    def __init__(
+        self,
+        ctx: moderngl.Context,
+        program: moderngl.Program,
+        index_buffer: moderngl.Buffer,
+        size: int = CHUNK.ARENA_SIZE,
+        binding: int = 0,
+    ) -> None:
+        self.ctx = ctx
+        self.program = program
+        self.index_buffer = index_buffer
+        self.binding = binding
+        self.vbo = ctx.buffer(reserve=size)
+        # origin of the chunk in every slot of the world, indexed by the base instance of its draw
+        self.origins = ctx.buffer(reserve=WORLD.VOLUME * 3 * 4)
+        self.commands = ctx.buffer(reserve=WORLD.VOLUME * COMMAND_SIZE)
+        self.vao = self.get_vao()
+        # free ranges as sorted offsets and their sizes, neighbouring ranges are merged on release
+        self.free_offsets = [0]
+        self.free_sizes = [size]
+        self.live_bytes = 0
+        self.allocations = 0
+        self.growths = 0
+
+    @property
+    def size(self) -> int:
+        return self.vbo.size
+
+    def get_vao(self) -> moderngl.VertexArray:
+        return self.ctx.vertex_array(
+            self.program,
+            [(self.origins, "3f/i", "chunk_origin")],
+            index_buffer=self.index_buffer,
+            index_element_size=4,
+        )
+
+    @staticmethod
+    def get_size_class(nbytes: int) -> int:
+        # four classes per power of two, a mesh that grows by less than a quarter stays where it is
+        if nbytes <= CHUNK.VBO_MIN_SIZE:
+            return CHUNK.VBO_MIN_SIZE
+        step = 1 << max((nbytes - 1).bit_length() - 3, 0)
+        return -(-nbytes // step) * step
+
+    def fits(self, size: int, nbytes: int) -> bool:
+        # ranges twice the size the data would get are given back so shrinking meshes free their memory
+        return nbytes <= size <= 2 * self.get_size_class(nbytes)
+
+    def allocate(self, nbytes: int) -> tuple[int, int]:
+        # offset and size of a range holding at least nbytes, first fit
+        size = self.get_size_class(nbytes)
+        for i, free in enumerate(self.free_sizes):
+            if free >= size:
+                offset = self.free_offsets[i]
+                if free == size:
+                    del self.free_offsets[i], self.free_sizes[i]
+                else:
+                    self.free_offsets[i] += size
+                    self.free_sizes[i] -= size
+                self.live_bytes += size
+                self.allocations += 1
+                return offset, size
+        self._grow(size)
+        return self.allocate(nbytes)
+
+    def release(self, offset: int, size: int) -> None:
+        self.live_bytes -= size
+        self._free(offset, size)
+
+    def _free(self, offset: int, size: int) -> None:
+        i = bisect.bisect(self.free_offsets, offset)
+        if i < len(self.free_offsets) and offset + size == self.free_offsets[i]:
+            size += self.free_sizes[i]
+            del self.free_offsets[i], self.free_sizes[i]
+        if i > 0 and self.free_offsets[i - 1] + self.free_sizes[i - 1] == offset:
+            self.free_sizes[i - 1] += size
+            return
+        self.free_offsets.insert(i, offset)
+        self.free_sizes.insert(i, size)
+
+    def _grow(self, size: int) -> None:
+        # doubles the buffer, ranges keep their offsets so meshes never notice
+        old = self.vbo
+        self.vbo = self.ctx.buffer(reserve=max(old.size * 2, old.size + size))
+        self.ctx.copy_buffer(self.vbo, old)
+        self._free(old.size, self.vbo.size - old.size)
+        old.release()
+        self.growths += 1
+
+    def write(self, data: NDArray[Shape["*"], UInt32], offset: int) -> None:
+        self.vbo.write(data, offset=offset)
+
+    def set_origin(self, index: int, position: tuple[int, int, int]) -> None:
+        self.origins.write(np.array(position, dtype=np.float32) * CHUNK.SIZE, offset=index * 3 * 4)
+
+    def render(self, commands: NDArray[Shape["*, 5"], UInt32]) -> None:
+        if len(commands):
+            self.commands.write(commands)
+            self.vbo.bind_to_storage_buffer(self.binding)
+            self.vao.render_indirect(self.commands, count=len(commands))
@@ -16,18 +16,29 @@ class BaseMesh:
     ctx: moderngl.Context = dataclasses.field(init=False, repr=False)
     program: moderngl.Program = dataclasses.field(init=False, repr=False)
     vao: moderngl.VertexArray = dataclasses.field(init=False)
+    vbo: moderngl.Buffer = dataclasses.field(init=False, repr=False)
     vertices: NDArray[Shape["*, *"], t.Any] = dataclasses.field(init=False)
 
     def __post_init__(self) -> None:
         self.ctx = self.app.ctx
         self.vao = self.get_vao(self.vertices)
 
-    def get_vao(self, vertices: NDArray[Shape["*, *"], t.Any]) -> moderngl.VertexArray:
-        vbo: moderngl.Buffer = self.ctx.buffer(vertices)
+    def get_vao(
+        self, vertices: NDArray[Shape["*, *"], t.Any], index_buffer: moderngl.Buffer | None = None
+    ) -> moderngl.VertexArray:
+        self.vbo = self.ctx.buffer(vertices)
         vao: moderngl.VertexArray = self.ctx.vertex_array(
-            self.program, [(vbo, self.vbo_format, *self.attrs)], skip_errors=True
+            self.program,
+            [(self.vbo, self.vbo_format, *self.attrs)],
+            index_buffer=index_buffer,
+            index_element_size=4,
+            skip_errors=True,
         )
         return vao
 
+    def release(self) -> None:
+        self.vao.release()
+        self.vbo.release()
+
     def render(self) -> None:
         self.vao.render()
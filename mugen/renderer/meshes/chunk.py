@@ -1,7 +1,14 @@
 import dataclasses
+import itertools
+import threading
 import typing as t
 
-from ...utils import build_chunk_mesh
+import moderngl
+import numpy as np
+from nptyping import NDArray, Shape, UInt32
+
+from ...utils import CHUNK, QUAD_INDICES, build_chunk_mesh, build_greedy_chunk_mesh, build_lod_chunk_mesh
+from .arena import VertexArena
 from .base import BaseMesh
 
 if t.TYPE_CHECKING:
@@ -11,20 +18,137 @@ if t.TYPE_CHECKING:
 __all__: tuple[str, ...] = ("ChunkMesh",)
 
 
+# words of the record every face is uploaded as, the vertex shader expands it into the 4 corners of a quad
+FACE_SIZE = 2
+# meshing scratch space of every thread, meshes are copied out of it at their exact size
+SCRATCH = threading.local()
+
+
 @dataclasses.dataclass
 class ChunkMesh(BaseMesh):
     chunk: "Chunk"
     name: str = "CHUNK"
+    vertex_data: list[NDArray[Shape["*"], UInt32]] | None = dataclasses.field(default=None, repr=False)
+    # level of detail the vertices are meshed at, each level halves the resolution of the voxels
+    lod: int = 0
 
     def __post_init__(self) -> None:
-        self.vbo_format = "1u4"
-        self.attrs = ("packed_data",)
-        _format_size = sum(int(i[:1]) for i in self.vbo_format.split())
-        self.vertices = build_chunk_mesh(self.chunk.voxels, _format_size, self.chunk.position, self.chunk.world.voxels)
+        # offset and size of the range of the world's vertex arena the mesh lives in, none while it is empty
+        self.range: tuple[int, int] | None = None
+        self.chunk.world.commands[self.chunk.index] = (0, 1, 0, 0, self.chunk.index)
+        self.chunk.world.vertex_arena.set_origin(self.chunk.index, self.chunk.position)
+        # faces of every section, they follow each other in the vertex buffer from the bottom section up
+        # faces may have been meshed ahead of time off the main thread
+        self.sections = self.get_vertex_data(self.chunk, lod=self.lod) if self.vertex_data is None else self.vertex_data
+        self.vertex_data = None
+        # sections whose voxels or the voxels around them changed since they were meshed
+        self.dirty: list[bool] = [False] * CHUNK.SECTIONS
+        self.vertices = np.concatenate(self.sections)
         self.program = self.app.shader.get_program(self.name)
         super().__post_init__()
 
-    def _rebuild(self) -> None:
-        _format_size = sum(int(i[:1]) for i in self.vbo_format.split())
-        self.vertices = build_chunk_mesh(self.chunk.voxels, _format_size, self.chunk.position, self.chunk.world.voxels)
-        self.vao = self.get_vao(self.vertices)
+    @staticmethod
+    def get_vertex_data(
+        chunk: "Chunk", greedy: bool = CHUNK.GREEDY_MESHING, lod: int = 0
+    ) -> list[NDArray[Shape["*"], UInt32]]:
+        # coarser levels are only ever seen from afar, where nothing is edited, so they are meshed in one piece
+        if lod:
+            arrays = chunk.world.storage.arrays
+            return [build_lod_chunk_mesh(chunk.index, chunk.position, arrays, ChunkMesh.get_scratch(), 1 << lod)]
+        return [ChunkMesh.get_section_data(chunk, section, greedy) for section in range(CHUNK.SECTIONS)]
+
+    @staticmethod
+    def get_section_data(
+        chunk: "Chunk", section: int, greedy: bool = CHUNK.GREEDY_MESHING
+    ) -> NDArray[Shape["*"], UInt32]:
+        mesher = build_greedy_chunk_mesh if greedy else build_chunk_mesh
+        y0 = section * CHUNK.SECTION_HEIGHT
+        arrays = chunk.world.storage.arrays
+        return mesher(  # type: ignore
+            chunk.index, chunk.position, arrays, ChunkMesh.get_scratch(), y0, y0 + CHUNK.SECTION_HEIGHT
+        )
+
+    @staticmethod
+    def get_scratch() -> NDArray[Shape["*"], UInt32]:
+        if (vertex := getattr(SCRATCH, "vertex", None)) is None:
+            # at most every other voxel is solid with all 6 faces showing, so 3 faces per voxel, pages are only
+            # backed once a mesh gets that far
+            vertex = SCRATCH.vertex = np.empty(CHUNK.VOLUME * 3 * FACE_SIZE, dtype=np.uint32)
+        return vertex
+
+    @staticmethod
+    def get_index_buffer(ctx: moderngl.Context) -> moderngl.Buffer:
+        # quads of 4 vertices share their triangles relative to the first one, so a single buffer sized for the
+        # largest possible mesh indexes every chunk, vertex i is corner i % 4 of face i // 4
+        quads = np.arange(CHUNK.VOLUME * 3, dtype=np.uint32)[:, None] * 4
+        return ctx.buffer(quads + QUAD_INDICES)
+
+    @staticmethod
+    def get_vertex_arena(
+        ctx: moderngl.Context, program: moderngl.Program, index_buffer: moderngl.Buffer
+    ) -> VertexArena:
+        return VertexArena(ctx, program, index_buffer)
+
+    @property
+    def command(self) -> NDArray[Shape["5"], UInt32]:
+        # indirect draw of the mesh in the table of the world, the base instance is the slot of the chunk and selects
+        # its origin
+        return t.cast(NDArray[Shape["5"], UInt32], self.chunk.world.commands[self.chunk.index])
+
+    @property
+    def offsets(self) -> list[int]:
+        # first word of every section in the vertex buffer, followed by the total
+        return [0, *itertools.accumulate(len(vertices) for vertices in self.sections)]
+
+    def get_vao(self, vertices: NDArray[Shape["*"], UInt32]) -> moderngl.VertexArray | None:  # type: ignore
+        # chunks without a single visible face have nothing to upload
+        if not len(vertices):
+            self.release()
+            return None
+        arena = self.chunk.world.vertex_arena
+        if self.range is None or not arena.fits(self.range[1], vertices.nbytes):
+            self.release()
+            self.range = arena.allocate(vertices.nbytes)
+        offset = self.range[0]
+        arena.write(vertices, offset)
+        first = offset // vertices.itemsize // FACE_SIZE
+        self.command[:] = (len(vertices) // FACE_SIZE * 6, 1, 0, first * 4, self.chunk.index)
+        # every mesh is drawn through the vertex array of the arena
+        return arena.vao
+
+    def _rebuild(self, vertex_data: list[NDArray[Shape["*"], UInt32]] | None = None, lod: int | None = None) -> None:
+        self.lod = self.lod if lod is None else lod
+        self.sections = self.get_vertex_data(self.chunk, lod=self.lod) if vertex_data is None else vertex_data
+        self.dirty = [False] * CHUNK.SECTIONS
+        self._upload()
+
+    def rebuild_dirty(self) -> None:
+        if self.lod:
+            self._rebuild()
+            return
+        offsets = self.offsets
+        changed = []
+        for section, dirty in enumerate(self.dirty):
+            if dirty:
+                self.sections[section] = self.get_section_data(self.chunk, section)
+                changed.append(section)
+        self.dirty = [False] * CHUNK.SECTIONS
+        if self.vao is None or any(len(self.sections[s]) != offsets[s + 1] - offsets[s] for s in changed):
+            self._upload()
+            return
+        # sections that kept their size are written over their own range of the vertex buffer
+        for section in changed:
+            self.vertices[offsets[section] : offsets[section + 1]] = self.sections[section]
+            offset = self.range[0] + offsets[section] * self.vertices.itemsize  # type: ignore
+            self.chunk.world.vertex_arena.write(self.sections[section], offset)
+
+    def _upload(self) -> None:
+        self.vertices = np.concatenate(self.sections)
+        self.vao = self.get_vao(self.vertices)  # type: ignore
+
+    def release(self) -> None:
+        if self.range is not None:
+            self.chunk.world.vertex_arena.release(*self.range)
+            self.range = None
+        self.command[0] = 0
+        self.vao = None  # type: ignore
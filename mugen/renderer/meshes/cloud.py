@@ -4,8 +4,8 @@ import numba
 import numpy as np
 from nptyping import NDArray, Shape, UInt8, UInt16
 
-from ...utils import CHUNK, WORLD
-from ...utils.noise_generator import noise2
+from ...utils import CHUNK, WORLD, tracer
+from ...utils.noise_generator import NoiseSeed, noise2
 from .base import BaseMesh
 
 __all__: tuple[str, ...] = ("CloudMesh",)
@@ -21,6 +21,7 @@ CLOUD_HEIGHT = numba.int64(WORLD.CLOUD_HEIGHT)
 
 @dataclasses.dataclass
 class CloudMesh(BaseMesh):
+    seed: NoiseSeed
     name: str = "CLOUD"
 
     def __post_init__(self) -> None:
@@ -32,20 +33,22 @@ class CloudMesh(BaseMesh):
 
     def get_vertex_data(self) -> NDArray[Shape["*, *"], UInt16]:
         cloud_data = np.zeros(WORLD_AREA * CHUNK_SIZE**2, dtype=np.uint8)
-        self.gen_clouds(cloud_data)
-        return self.build_mesh(cloud_data)  # type: ignore
+        with tracer.span("cloud noise"):
+            self.gen_clouds(cloud_data, self.seed)
+        with tracer.span("cloud mesh"):
+            return self.build_mesh(cloud_data)  # type: ignore
 
     @staticmethod
-    @numba.njit  # type: ignore
-    def gen_clouds(cloud_data: NDArray[Shape["*"], UInt8]) -> None:
+    @numba.njit(cache=True)  # type: ignore
+    def gen_clouds(cloud_data: NDArray[Shape["*"], UInt8], seed: NoiseSeed) -> None:
         for x in range(WORLD_W * CHUNK_SIZE):
             for z in range(WORLD_D * CHUNK_SIZE):
-                if noise2(0.13 * x, 0.13 * z) < 0.2:
+                if noise2(0.13 * x, 0.13 * z, seed) < 0.2:
                     continue
                 cloud_data[x + WORLD_W * CHUNK_SIZE * z] = 1
 
     @staticmethod
-    @numba.njit  # type: ignore
+    @numba.njit(cache=True)  # type: ignore
     def build_mesh(cloud_data: NDArray[Shape["*"], UInt8]) -> NDArray[Shape["*, *"], UInt16]:
         mesh = np.empty(WORLD_AREA * CHUNK_AREA * 6 * 3, dtype=np.uint16)
         index = 0
@@ -3,6 +3,7 @@ import typing as t
 import moderngl
 
 from ..components import Clouds, Water, World
+from ..utils import tracer
 from .marker import VoxelMarker
 
 if t.TYPE_CHECKING:
@@ -15,9 +16,11 @@ __all__: tuple[str, ...] = ("Scene",)
 class Scene:
     def __init__(self, app: "Mugen") -> None:
         self.app = app
-        self.world = World(self.app)
+        with tracer.span("world"):
+            self.world = World(self.app)
         self.marker = VoxelMarker(self.world.chunk_manager)
-        self.clouds = Clouds(self.app)
+        with tracer.span("clouds"):
+            self.clouds = Clouds(self.app, self.world.seed)
         self.water = Water(self.app)
 
     def render(self) -> None:
@@ -27,9 +30,9 @@ class Scene:
         self.app.ctx.enable(moderngl.CULL_FACE)
 
         self.world.render()
+        self.world.query_occlusion()
         self.marker.render()
 
     def update(self) -> None:
         self.world.update()
         self.marker.update()
-        self.clouds.update()
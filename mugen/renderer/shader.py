@@ -2,8 +2,9 @@ import pathlib
 import typing as t
 
 import moderngl
+import numpy as np
 
-from ..utils import SHADERS, WORLD
+from ..utils import CHUNK, SHADERS, WORLD, tracer
 
 if t.TYPE_CHECKING:
     from mugen import Mugen
@@ -12,12 +13,38 @@ if t.TYPE_CHECKING:
 __all__: tuple[str, ...] = ("Shader",)
 
 
+# std140 layout of the Camera uniform block the shaders declare, no member needs padding in this order
+CAMERA_BLOCK = np.dtype(
+    [
+        ("projection", np.float32, (4, 4)),
+        ("view", np.float32, (4, 4)),
+        ("bg_color", np.float32, 3),
+        ("time", np.float32),
+        ("water_line", np.float32),
+        ("water_area", np.int32),
+        ("center", np.int32),
+        ("cloud_scale", np.float32),
+    ]
+)
+CAMERA_BINDING = 0
+
+
 class Shader:
     def __init__(self, *, app: "Mugen") -> None:
         self.app = app
         self.ctx = app.ctx
         self._player = app._player
         self._shaders: dict[str, moderngl.Program] = {}
+        self._camera = np.zeros(1, dtype=CAMERA_BLOCK)
+        projection = np.frombuffer(self._player._projection.to_bytes(), dtype=np.float32)
+        self._camera["projection"] = projection.reshape(4, 4)
+        self._camera["bg_color"] = WORLD.BG_COLOR
+        self._camera["water_line"] = WORLD.WATER_LINE
+        self._camera["water_area"] = WORLD.WATER_AREA
+        self._camera["center"] = WORLD.CENTER_XZ
+        self._camera["cloud_scale"] = WORLD.CLOUD_SCALE
+        self.camera_buffer = self.ctx.buffer(self._camera)
+        self.camera_buffer.bind_to_uniform_block(CAMERA_BINDING)
 
         self._load_shaders()
 
@@ -25,20 +52,15 @@ class Shader:
             self._set_uniforms(name)
 
     def _set_uniforms(self, name: str) -> None:
-        self.get_program(name)["uProjection"].write(self._player._projection)  # type: ignore
-        if name == "CLOUD":
-            self.get_program(name)["center"].value = WORLD.CENTER_XZ  # type: ignore
-            self.get_program(name)["cloudScale"].value = WORLD.CLOUD_SCALE  # type: ignore
-        elif name == "CHUNK" or name == "CUBE":
+        if name == "CHUNK":
+            self.get_program(name)["uTexture"].value = 1  # type: ignore
+        elif name == "CUBE":
             self.get_program(name)["uModel"].write(self._player._view)  # type: ignore
-            self.get_program(name)["uTexture"].value = 1 if name == "CHUNK" else 0  # type: ignore
+            self.get_program(name)["uTexture"].value = 0  # type: ignore
+        elif name == "BOUNDS":
+            self.get_program(name)["uSize"].value = CHUNK.SIZE + 2 * WORLD.QUERY_MARGIN  # type: ignore
         elif name == "WATER":
             self.get_program(name)["uTexture"].value = 2  # type: ignore
-            self.get_program(name)["waterArea"].value = WORLD.WATER_AREA  # type: ignore
-        if name == "CLOUD" or name == "CHUNK":
-            self.get_program(name)["bgColor"].write(WORLD.BG_COLOR)  # type: ignore
-        if name == "CHUNK" or name == "WATER":
-            self.get_program(name)["waterLine"].value = WORLD.WATER_LINE  # type: ignore
 
     def _load_shaders(self) -> None:
         self.app.logger.info("Loading shaders...")
@@ -47,12 +69,19 @@ class Shader:
             vert: pathlib.Path = getattr(SHADERS, f"{name}_VERT")
             frag: pathlib.Path = getattr(SHADERS, f"{name}_FRAG")
             self.app.logger.debug(f"Loading {name} shader...")
-            self._shaders[name] = self._load_shader(vert, frag)
+            with tracer.span(f"shader {name}"):
+                self._shaders[name] = self._load_shader(vert, frag)
         self.app.logger.info("Loaded shaders.")
 
     def _load_shader(self, vert: pathlib.Path, frag: pathlib.Path) -> moderngl.Program:
         self.app.logger.debug(f"Loading {vert.name} and {frag.name}...")
-        return self.ctx.program(vertex_shader=vert.read_text(), fragment_shader=frag.read_text())
+        return self.bind(self.ctx.program(vertex_shader=vert.read_text(), fragment_shader=frag.read_text()))
+
+    @staticmethod
+    def bind(program: moderngl.Program) -> moderngl.Program:
+        if "Camera" in program:
+            program["Camera"].binding = CAMERA_BINDING  # type: ignore
+        return program
 
     def get_program(self, name: str) -> moderngl.Program:
         if name not in self._shaders:
@@ -60,5 +89,7 @@ class Shader:
         return self._shaders[name]
 
     def update(self) -> None:
-        for name in self._shaders:
-            self.get_program(name)["uView"].write(self._player._view)  # type: ignore
+        # the whole block in one write, every program reads it through the same binding
+        self._camera["view"] = np.frombuffer(self._player._view.to_bytes(), dtype=np.float32).reshape(4, 4)
+        self._camera["time"] = self.app._time
+        self.camera_buffer.write(self._camera)
@@ -3,7 +3,7 @@ import typing as t
 import moderngl
 import pygame
 
-from ..utils import TEXTURES
+from ..utils import TEXTURES, tracer
 
 if t.TYPE_CHECKING:
     from mugen import Mugen
@@ -24,20 +24,19 @@ class Textures:
         self.get_texture("WATER").use(location=2)
 
     def _load_texture(self, path: str, tex_array: bool = False) -> moderngl.Texture | moderngl.TextureArray:
-        image = pygame.image.load(path)
-        image = pygame.transform.flip(image, flip_x=True, flip_y=False)
+        with tracer.span("decode"):
+            image = pygame.image.load(path)
+            image = pygame.transform.flip(image, flip_x=True, flip_y=False)
+            data = pygame.image.tostring(image, "RGBA", False)
         texture: moderngl.Texture | moderngl.TextureArray
         if tex_array:
             layers = 3 * image.get_height() // image.get_width()
-            texture = self.ctx.texture_array(
-                (image.get_width(), image.get_height() // layers, layers),
-                4,
-                pygame.image.tostring(image, "RGBA", False),
-            )
+            texture = self.ctx.texture_array((image.get_width(), image.get_height() // layers, layers), 4, data)
         else:
-            texture = self.ctx.texture(image.get_size(), 4, pygame.image.tostring(image, "RGBA", False))
+            texture = self.ctx.texture(image.get_size(), 4, data)
         texture.anisotropy = 32
-        texture.build_mipmaps()
+        with tracer.span("mipmaps"):
+            texture.build_mipmaps()
         texture.filter = moderngl.LINEAR_MIPMAP_LINEAR, moderngl.LINEAR
         return texture
 
@@ -45,9 +44,10 @@ class Textures:
         self.app.logger.info("Loading textures...")
         for texture in TEXTURES:
             self.app.logger.info(f"Loading texture '{texture.name}' from '{texture.value}'")
-            self._textures[texture.name] = self._load_texture(
-                texture.value.as_posix(), tex_array="array" in texture.name.lower()
-            )
+            with tracer.span(f"texture {texture.name}"):
+                self._textures[texture.name] = self._load_texture(
+                    texture.value.as_posix(), tex_array="array" in texture.name.lower()
+                )
         self.app.logger.info("Textures loaded.")
 
     def get_texture(self, name: str) -> moderngl.Texture | moderngl.TextureArray:
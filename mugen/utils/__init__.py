@@ -1,6 +1,11 @@
-from .constants import CAMERA, CHUNK, PLAYER, SHADERS, TEXTURES, WINDOW, WORLD
+from .constants import CAMERA, CHUNK, JIT, PLAYER, SHADERS, TEXTURES, WINDOW, WORLD
+from .jit import fingerprint, prune_cache
 from .logging import Logger
-from .mesh_builder import build_chunk_mesh, get_chunk_idx
+from .mesh_builder import QUAD_INDICES, build_chunk_mesh, build_greedy_chunk_mesh, build_lod_chunk_mesh, get_chunk_idx
+from .occlusion import ALL_FACES, get_face_connectivity, get_reachable
+from .region import RegionStore
+from .storage import VoxelStorage
+from .tracer import tracer
 
 __all__: tuple[str, ...] = (
     "WINDOW",
@@ -10,7 +15,19 @@ __all__: tuple[str, ...] = (
     "CHUNK",
     "TEXTURES",
     "WORLD",
+    "JIT",
     "Logger",
+    "QUAD_INDICES",
     "build_chunk_mesh",
+    "build_greedy_chunk_mesh",
+    "build_lod_chunk_mesh",
     "get_chunk_idx",
+    "ALL_FACES",
+    "get_face_connectivity",
+    "get_reachable",
+    "RegionStore",
+    "VoxelStorage",
+    "fingerprint",
+    "prune_cache",
+    "tracer",
 )
@@ -1,5 +1,6 @@
 import enum
 import math
+import os
 import pathlib
 import random
 import typing as t
@@ -14,6 +15,7 @@ __all__: tuple[str, ...] = (
     "PLAYER",
     "TEXTURES",
     "WORLD",
+    "JIT",
 )
 
 
@@ -30,6 +32,18 @@ class CHUNK:
     AREA = SIZE * SIZE
     VOLUME = AREA * SIZE
     CHUNK_SPHERE_RADIUS = math.sqrt(3) * H_SIZE
+    # merge coplanar faces of the same voxel and ao into larger quads instead of emitting one quad per face
+    GREEDY_MESHING = True
+    # rows of voxels meshed together, an edit only remeshes the sections around it
+    SECTION_HEIGHT = 16
+    SECTIONS = SIZE // SECTION_HEIGHT
+    # smallest range of the vertex arena handed to a mesh and the bytes the arena starts with, it doubles when full
+    VBO_MIN_SIZE = 4096
+    ARENA_SIZE = 32 * 2**20
+    # distances in voxels past which chunks are meshed from 2x, 4x and 8x coarser voxels, a chunk only changes level
+    # once it is LOD_HYSTERESIS past a threshold, so moving along one does not remesh it back and forth
+    LOD_DISTANCES = (192, 384, 640)
+    LOD_HYSTERESIS = 24
 
 
 class CAMERA:
@@ -44,6 +58,8 @@ class CAMERA:
 
 class WORLD:
     BG_COLOR = glm.vec3(0.58, 0.83, 0.99)
+    SAVE_DIR = pathlib.Path("saves/world")
+    # seed of new worlds, a saved world keeps the one its region store was created with
     SEED = random.randint(-(2**63), 2**63 - 1)
     WIDTH = 30
     HEIGHT = 2
@@ -56,6 +72,29 @@ class WORLD:
     WATER_AREA = 5 * CHUNK.SIZE * WIDTH
     CLOUD_SCALE = 25
     CLOUD_HEIGHT = HEIGHT * CHUNK.SIZE * 2
+    HEIGHT_MAP_CACHE_SIZE = AREA
+    WORKERS = os.cpu_count() or 1
+    # background threads generating and meshing chunks, leaving a core to the render loop
+    PIPELINE_WORKERS = max(WORKERS - 1, 1)
+    # per frame cap on uploading finished meshes, whichever runs out first
+    UPLOAD_TIME_BUDGET = 0.004
+    UPLOAD_BYTE_BUDGET = 4 * 2**20
+    REGION_SIZE = 8
+    # region files a chunk window can touch at once, kept open by the region store
+    OPEN_REGIONS = (WIDTH // REGION_SIZE + 2) * (DEPTH // REGION_SIZE + 2) * (HEIGHT // REGION_SIZE + 2)
+    MEMMAP_VOXELS = False
+    # recenter the chunk window on the player instead of keeping a fixed island
+    STREAMING = False
+    # chunk columns along each side of the tiles frustum culling rejects at once
+    CULLING_TILE = 4
+    # skip chunks on the frustum that no path of air from the chunk of the camera leads into
+    OCCLUSION_CULLING = True
+    # leave out chunks whose bounding box no sample of the last frame passed the depth test for
+    OCCLUSION_QUERIES = False
+    # voxels the queried boxes stick out of their chunks, so terrain on a chunk border never hides its own box
+    QUERY_MARGIN = 0.5
+    # frames between drawing the boxes and reading their results, the gpu is done with them by then
+    QUERY_LATENCY = 3
 
 
 class PLAYER:
@@ -66,6 +105,11 @@ class PLAYER:
     POSITION = glm.vec3(WORLD.CENTER_XZ, WORLD.CENTER_Y * 1.5, WORLD.CENTER_XZ)
 
 
+class JIT:
+    # numba's own cache setting wins, compiled kernels go to a subdirectory per source fingerprint
+    CACHE_DIR = pathlib.Path(os.environ.get("NUMBA_CACHE_DIR") or ".numba_cache")
+
+
 class SHADERS(enum.Enum):
     QUAD_VERT = pathlib.Path("assets/shaders/quad.vert")
     QUAD_FRAG = pathlib.Path("assets/shaders/quad.frag")
@@ -77,6 +121,8 @@ class SHADERS(enum.Enum):
     CLOUD_FRAG = pathlib.Path("assets/shaders/cloud.frag")
     WATER_VERT = pathlib.Path("assets/shaders/water.vert")
     WATER_FRAG = pathlib.Path("assets/shaders/water.frag")
+    BOUNDS_VERT = pathlib.Path("assets/shaders/bounds.vert")
+    BOUNDS_FRAG = pathlib.Path("assets/shaders/bounds.frag")
 
     def __get__(self, instance: t.Any, owner: t.Type[t.Any]) -> pathlib.Path:
         return self.value
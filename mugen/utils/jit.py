@@ -0,0 +1,46 @@
+import hashlib
+import importlib.metadata
+import pathlib
+import shutil
+import sys
+
+import numba
+
+from .constants import JIT
+
+__all__: tuple[str, ...] = (
+    "CACHE_DIR",
+    "fingerprint",
+    "prune_cache",
+)
+
+
+PACKAGE_DIR = pathlib.Path(__file__).resolve().parents[1]
+DEPENDENCIES = ("numba", "llvmlite", "numpy", "opensimplex")
+
+
+def fingerprint() -> str:
+    # numba only invalidates a kernel when its own file changes, but kernels bake in values from constants.py
+    # and inline kernels of other modules, so any source change of the package starts a fresh cache
+    digest = hashlib.sha256(sys.version.encode())
+    for name in DEPENDENCIES:
+        digest.update(f"{name}=={importlib.metadata.version(name)}".encode())
+    for path in sorted(PACKAGE_DIR.rglob("*.py")):
+        digest.update(path.relative_to(PACKAGE_DIR).as_posix().encode())
+        digest.update(path.read_bytes())
+    return digest.hexdigest()[:16]
+
+
+def prune_cache() -> list[pathlib.Path]:
+    # caches of other fingerprints can never be loaded again
+    if not JIT.CACHE_DIR.is_dir():
+        return []
+    stale = [path for path in JIT.CACHE_DIR.iterdir() if path.is_dir() and path != CACHE_DIR]
+    for path in stale:
+        shutil.rmtree(path, ignore_errors=True)
+    return stale
+
+
+CACHE_DIR = JIT.CACHE_DIR / fingerprint()
+# numba resolves the cache location when a kernel is decorated, so this runs before any kernel module is imported
+numba.config.CACHE_DIR = str(CACHE_DIR.resolve())
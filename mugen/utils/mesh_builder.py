@@ -1,13 +1,17 @@
 import typing as t
 
 import numpy as np
-from nptyping import NDArray, Shape, UInt8, UInt32
+from nptyping import Int32, Int64, NDArray, Shape, UInt8, UInt32
 from numba import int64, njit
 
 from . import CHUNK, WORLD
+from .storage import DENSE, VoxelArrays
 
 __all__: tuple[str, ...] = (
+    "QUAD_INDICES",
     "build_chunk_mesh",
+    "build_greedy_chunk_mesh",
+    "build_lod_chunk_mesh",
     "get_chunk_idx",
 )
 
@@ -20,178 +24,434 @@ WORLD_HEIGHT = int64(WORLD.HEIGHT)
 WORLD_DEPTH = int64(WORLD.DEPTH)
 WORLD_AREA = int64(WORLD.AREA)
 
+# faces in mesh order: top, bottom, right, left, back, front
+# step from a voxel to the neighbour its face looks at
+FACE_NORMALS = np.array([(0, 1, 0), (0, -1, 0), (1, 0, 0), (-1, 0, 0), (0, 0, -1), (0, 0, 1)], dtype=np.int64)
+# normal axis followed by the two axes spanning the face, 0: x, 1: y, 2: z
+FACE_AXES = np.array([(1, 0, 2), (1, 0, 2), (0, 1, 2), (0, 1, 2), (2, 0, 1), (2, 0, 1)], dtype=np.int64)
+# the vertex shader expands faces into their corners with copies of FACE_CORNERS and FACE_QUADS
+# offsets of the corners v0..v3 along the two spanning axes, in the order ambient_occlusion returns them
+FACE_CORNERS = np.array([((0, 0), (1, 0), (1, 1), (0, 1))] * 4 + [((0, 0), (0, 1), (1, 1), (1, 0))] * 2, dtype=np.int64)
+# corners of a face in the order its vertices are emitted, unflipped and flipped along the other diagonal
+FACE_QUADS = np.array(
+    [
+        ((0, 3, 2, 1), (1, 0, 3, 2)),
+        ((2, 3, 0, 1), (3, 0, 1, 2)),
+        ((0, 1, 2, 3), (3, 0, 1, 2)),
+        ((2, 1, 0, 3), (1, 0, 3, 2)),
+        ((0, 1, 2, 3), (3, 0, 1, 2)),
+        ((2, 1, 0, 3), (1, 0, 3, 2)),
+    ],
+    dtype=np.int64,
+)
+# the two triangles of every quad relative to its first vertex, split along the diagonal from vertex 0 to 2
+QUAD_INDICES = np.array((0, 1, 2, 0, 2, 3), dtype=np.uint32)
+# occupancy words span a chunk column and the voxel on either end of it
+INNER_BITS = int64(((1 << CHUNK.SIZE) - 1) << 1)
+# stands in for voxels of chunks that are not loaded, any solid id would do
+MISSING = int64(255)
+
+
+@njit(cache=True)  # type: ignore
+def pack(x: int, y: int, z: int, voxel_id: t.Any, face_id: int, w: int, h: int, ao: int, flip: int) -> tuple[int, int]:
+    # x: 6 bits, y: 6 bits, z: 6 bits, voxel_id: 8 bits, face_id: 3 bits
+    # w: 6 bits, h: 6 bits, flip: 1 bit, ao of the corners v0..v3: 2 bits each
+    head = (x << 26) | (y << 20) | (z << 14) | (voxel_id << 6) | (face_id << 3)
+    return int(head), int((w << 26) | (h << 20) | (flip << 8) | ao)
 
-@njit  # type: ignore
-def pack(x: int, y: int, z: int, voxel_id: t.Any, face_id: int, ao: int, flip: int) -> int:
-    # x: 6 bits, y: 6 bits, z: 6 bits, voxel_id: 8 bits, face_id: 3 bits, ao: 2 bits, flip: 1 bit
-    a, b, c, d, e, f, g = x, y, z, voxel_id, face_id, ao, flip
-    return int((a << 26) | (b << 20) | (c << 14) | (d << 6) | (e << 3) | (f << 1) | g)
 
+@njit(inline="always", cache=True)  # type: ignore
+def is_open(occupancy: NDArray[Shape["*, *"], Int64], x: int, y: int, z: int) -> int:
+    return 1 - ((occupancy[x + 1, y + 1] >> (z + 1)) & 1)  # type: ignore
 
-@njit  # type: ignore
+
+@njit(inline="always", cache=True)  # type: ignore
 def ambient_occlusion(
     local_pos: tuple[int, int, int],
-    world_pos: tuple[int, int, int],
-    world_voxels: NDArray[Shape["*, *"], UInt8],
+    occupancy: NDArray[Shape["*, *"], Int64],
     plane: str,
 ) -> t.Tuple[int, ...]:
     x, y, z = local_pos
-    wx, wy, wz = world_pos
     if plane == "Y":
-        directions: list[t.Tuple[t.Tuple[int, int, int], t.Tuple[int, int, int]]] = [
-            ((x, y, z - 1), (wx, wy, wz - 1)),
-            ((x - 1, y, z - 1), (wx - 1, wy, wz - 1)),
-            ((x - 1, y, z), (wx - 1, wy, wz)),
-            ((x - 1, y, z + 1), (wx - 1, wy, wz + 1)),
-            ((x, y, z + 1), (wx, wy, wz + 1)),
-            ((x + 1, y, z + 1), (wx + 1, wy, wz + 1)),
-            ((x + 1, y, z), (wx + 1, wy, wz)),
-            ((x + 1, y, z - 1), (wx + 1, wy, wz - 1)),
-        ]
-        a, b, c, d, e, f, g, h = [is_voxel_visible(a, b, world_voxels) for a, b in directions]
+        a, b, c, d, e, f, g, h = (
+            is_open(occupancy, x, y, z - 1),
+            is_open(occupancy, x - 1, y, z - 1),
+            is_open(occupancy, x - 1, y, z),
+            is_open(occupancy, x - 1, y, z + 1),
+            is_open(occupancy, x, y, z + 1),
+            is_open(occupancy, x + 1, y, z + 1),
+            is_open(occupancy, x + 1, y, z),
+            is_open(occupancy, x + 1, y, z - 1),
+        )
     elif plane == "X":
-        directions = [
-            ((x, y, z - 1), (wx, wy, wz - 1)),
-            ((x, y - 1, z - 1), (wx, wy - 1, wz - 1)),
-            ((x, y - 1, z), (wx, wy - 1, wz)),
-            ((x, y - 1, z + 1), (wx, wy - 1, wz + 1)),
-            ((x, y, z + 1), (wx, wy, wz + 1)),
-            ((x, y + 1, z + 1), (wx, wy + 1, wz + 1)),
-            ((x, y + 1, z), (wx, wy + 1, wz)),
-            ((x, y + 1, z - 1), (wx, wy + 1, wz - 1)),
-        ]
-        a, b, c, d, e, f, g, h = [is_voxel_visible(a, b, world_voxels) for a, b in directions]
+        a, b, c, d, e, f, g, h = (
+            is_open(occupancy, x, y, z - 1),
+            is_open(occupancy, x, y - 1, z - 1),
+            is_open(occupancy, x, y - 1, z),
+            is_open(occupancy, x, y - 1, z + 1),
+            is_open(occupancy, x, y, z + 1),
+            is_open(occupancy, x, y + 1, z + 1),
+            is_open(occupancy, x, y + 1, z),
+            is_open(occupancy, x, y + 1, z - 1),
+        )
     else:
-        directions = [
-            ((x - 1, y, z), (wx - 1, wy, wz)),
-            ((x - 1, y - 1, z), (wx - 1, wy - 1, wz)),
-            ((x, y - 1, z), (wx, wy - 1, wz)),
-            ((x + 1, y - 1, z), (wx + 1, wy - 1, wz)),
-            ((x + 1, y, z), (wx + 1, wy, wz)),
-            ((x + 1, y + 1, z), (wx + 1, wy + 1, wz)),
-            ((x, y + 1, z), (wx, wy + 1, wz)),
-            ((x - 1, y + 1, z), (wx - 1, wy + 1, wz)),
-        ]
-        a, b, c, d, e, f, g, h = [is_voxel_visible(a, b, world_voxels) for a, b in directions]
+        a, b, c, d, e, f, g, h = (
+            is_open(occupancy, x - 1, y, z),
+            is_open(occupancy, x - 1, y - 1, z),
+            is_open(occupancy, x, y - 1, z),
+            is_open(occupancy, x + 1, y - 1, z),
+            is_open(occupancy, x + 1, y, z),
+            is_open(occupancy, x + 1, y + 1, z),
+            is_open(occupancy, x, y + 1, z),
+            is_open(occupancy, x - 1, y + 1, z),
+        )
     return a + b + c, g + h + a, e + f + g, c + d + e
 
 
-@njit  # type: ignore
-def get_chunk_idx(position: tuple[int, int, int]) -> int:
+@njit(cache=True)  # type: ignore
+def get_chunk_idx(position: tuple[int, int, int], positions: NDArray[Shape["*, 3"], Int32]) -> int:
     wx, wy, wz = position
     x = wx // CHUNK_SIZE
     y = wy // CHUNK_SIZE
     z = wz // CHUNK_SIZE
-    if not (0 <= x < WORLD_WIDTH and 0 <= y < WORLD_HEIGHT and 0 <= z < WORLD_DEPTH):
+    if not 0 <= y < WORLD_HEIGHT:
+        return -1
+    # chunks wrap around the ring buffered chunk map, a slot only counts if it holds this very chunk
+    idx = x % WORLD_WIDTH + WORLD_WIDTH * (z % WORLD_DEPTH) + WORLD_AREA * y
+    if positions[idx, 0] != x or positions[idx, 2] != z:
         return -1
-    return int(x + WORLD_WIDTH * z + WORLD_AREA * y)
+    return int(idx)
 
 
-@njit  # type: ignore
-def is_voxel_visible(
-    local_pos: tuple[int, int, int],
-    world_pos: tuple[int, int, int],
-    world_voxels: NDArray[Shape["*, *"], UInt8],
-) -> bool:
-    idx = get_chunk_idx(world_pos)
-    if idx == -1:
-        return False
-    chunk_voxels = world_voxels[idx]
-    x, y, z = local_pos
-    v_idx = x % CHUNK_SIZE + z % CHUNK_SIZE * CHUNK_SIZE + y % CHUNK_SIZE * CHUNK_AREA
-    if chunk_voxels[v_idx]:
-        return False
+@njit(cache=True)  # type: ignore
+def get_neighbours(
+    position: tuple[int, int, int], positions: NDArray[Shape["*, 3"], Int32]
+) -> NDArray[Shape["27"], Int64]:
+    # slots of the 3x3x3 block of chunks around a chunk, resolved once per mesh instead of once per lookup
+    cx, cy, cz = position
+    neighbours = np.empty(27, dtype=np.int64)
+    for dy in range(-1, 2):
+        for dz in range(-1, 2):
+            for dx in range(-1, 2):
+                world_pos = ((cx + dx) * CHUNK_SIZE, (cy + dy) * CHUNK_SIZE, (cz + dz) * CHUNK_SIZE)
+                neighbours[(dx + 1) + 3 * (dz + 1) + 9 * (dy + 1)] = get_chunk_idx(world_pos, positions)
+    return neighbours
+
+
+@njit(cache=True)  # type: ignore
+def is_enclosed(world_voxels: VoxelArrays, neighbours: NDArray[Shape["27"], Int64]) -> bool:
+    # a solid single material chunk whose face neighbours are all solid single material chunks has no visible face
+    for i in (12, 14, 10, 16, 4, 22):
+        idx = neighbours[i]
+        if idx != -1 and world_voxels.modes[idx] <= 0:
+            return False
     return True
 
 
-@njit  # type: ignore
-def add_data(vertex: NDArray[Shape["*, *"], UInt8], idx: int, *vertices: t.Tuple[t.Any, ...]) -> int:
-    for v in vertices:
-        vertex[idx] = v
-        idx += 1
-    return idx
+@njit(cache=True)  # type: ignore
+def get_padded_voxels(
+    world_voxels: VoxelArrays, neighbours: NDArray[Shape["27"], Int64], y0: int, y1: int, border: int
+) -> NDArray[Shape["*, *, *"], UInt8]:
+    # rows y0 to y1 of the chunk and a border copied from its 26 neighbours, indexed by
+    # (x + border, y - y0 + border, z + border)
+    rows = y1 - y0
+    size = CHUNK_SIZE + 2 * border
+    padded = np.empty((size, rows + 2 * border, size), dtype=np.uint8)
+    # padded positions taken from the chunk before, the chunk itself and the chunk after along x and z
+    ranges = ((0, border), (border, CHUNK_SIZE + border), (CHUNK_SIZE + border, size))
+    # the border rows only come from the chunks below and above at the bottom and top of the chunk
+    bottom = border if y0 == 0 else 0
+    top = rows + border if y1 == CHUNK_SIZE else rows + 2 * border
+    for ny in range(3):
+        py0, py1 = (0, bottom) if ny == 0 else (bottom, top) if ny == 1 else (top, rows + 2 * border)
+        if py0 == py1:
+            continue
+        for nz in range(3):
+            z0, z1 = ranges[nz]
+            for nx in range(3):
+                x0, x1 = ranges[nx]
+                idx = neighbours[nx + 3 * nz + 9 * ny]
+                # border voxels of missing chunks hide the faces next to them like solid ones
+                mode = MISSING if idx == -1 else world_voxels.modes[idx]
+                if mode >= 0:
+                    padded[x0:x1, py0:py1, z0:z1] = mode
+                    continue
+                # padded positions map onto the neighbour without wrapping around
+                ox, oz = (1 - nx) * CHUNK_SIZE - border, (1 - nz) * CHUNK_SIZE - border
+                oy = y0 - border + (1 - ny) * CHUNK_SIZE
+                voxels, palette, packed = world_voxels.voxels[idx], world_voxels.palettes[idx], world_voxels.packed[idx]
+                for y in range(py0, py1):
+                    for z in range(z0, z1):
+                        row = (z + oz) * CHUNK_SIZE + (y + oy) * CHUNK_AREA + ox
+                        if mode == DENSE:
+                            for x in range(x0, x1):
+                                padded[x, y, z] = voxels[row + x]
+                        else:
+                            for x in range(x0, x1):
+                                v_idx = row + x
+                                padded[x, y, z] = palette[(packed[v_idx >> 1] >> ((v_idx & 1) << 2)) & 0xF]
+    return padded
+
+
+@njit(cache=True)  # type: ignore
+def get_occupancy(padded: NDArray[Shape["*, *, *"], UInt8]) -> NDArray[Shape["*, *"], Int64]:
+    # bit z + 1 of word [x + 1, y + 1] is set where the voxel at (x, y, z) of the padded rows hides the faces
+    # next to it
+    occupancy = np.zeros((padded.shape[0], padded.shape[1]), dtype=np.int64)
+    for x in range(padded.shape[0]):
+        for y in range(padded.shape[1]):
+            row = 0
+            for z in range(padded.shape[2]):
+                if padded[x, y, z]:
+                    row |= 1 << z
+            occupancy[x, y] = row
+    return occupancy
+
+
+@njit(inline="always", cache=True)  # type: ignore
+def get_face_masks(occupancy: NDArray[Shape["*, *"], Int64], x: int, y: int, inner: int) -> t.Tuple[int, ...]:
+    # visible faces of the column at (x, y) in mesh order, a face shows where its voxel is solid and the
+    # neighbour it looks at is not, inner masks the bits of the column without its padding
+    row = occupancy[x + 1, y + 1]
+    solid = row & inner
+    return (
+        solid & ~occupancy[x + 1, y + 2],
+        solid & ~occupancy[x + 1, y],
+        solid & ~occupancy[x + 2, y + 1],
+        solid & ~occupancy[x, y + 1],
+        solid & ~(row << 1),
+        solid & ~(row >> 1),
+    )
+
+
+@njit(inline="always", cache=True)  # type: ignore
+def get_face_key(
+    voxel_id: int,
+    face_id: int,
+    local_pos: tuple[int, int, int],
+    occupancy: NDArray[Shape["*, *"], Int64],
+) -> int:
+    # voxel_id: 8 bits and the ao of v0..v3: 2 bits each
+    if face_id < 2:
+        ao = ambient_occlusion(local_pos, occupancy, "Y")
+    elif face_id < 4:
+        ao = ambient_occlusion(local_pos, occupancy, "X")
+    else:
+        ao = ambient_occlusion(local_pos, occupancy, "Z")
+    return int((voxel_id << 8) | (ao[0] << 6) | (ao[1] << 4) | (ao[2] << 2) | ao[3])
+
 
+@njit(cache=True)  # type: ignore
+def add_quad(
+    vertex: NDArray[Shape["*"], UInt32],
+    idx: int,
+    face_id: int,
+    n: int,
+    a: int,
+    b: int,
+    w: int,
+    h: int,
+    key: int,
+    scale: int = 1,
+) -> int:
+    # a w by h face rectangle in the plane n along the normal axis, starting at (a, b) on the spanning axes, in
+    # voxels scale times the size of the chunk's own, written as a record of 2 words the vertex shader expands
+    normal_axis, a_axis, b_axis = FACE_AXES[face_id]
+    # faces looking towards positive coordinates lie on the far side of their voxels
+    plane = (n + 1) * scale if FACE_NORMALS[face_id, normal_axis] > 0 else n * scale
+    ca, cb = a * scale, b * scale
+    x = plane if normal_axis == 0 else ca if a_axis == 0 else cb
+    y = plane if normal_axis == 1 else ca if a_axis == 1 else cb
+    z = plane if normal_axis == 2 else ca if a_axis == 2 else cb
+    flip = int(((key >> 6) & 3) + ((key >> 2) & 3) < ((key >> 4) & 3) + (key & 3))
+    vertex[idx], vertex[idx + 1] = pack(x, y, z, key >> 8, face_id, w * scale, h * scale, key & 255, flip)
+    return idx + 2
 
-@njit  # type: ignore
+
+@njit(nogil=True, cache=True)  # type: ignore
 def build_chunk_mesh(
-    chunk_voxels: NDArray[Shape["*, *"], UInt8],
-    format_size: int,
+    chunk_idx: int,
     position: tuple[int, int, int],
-    world_voxels: NDArray[Shape["*, *"], UInt8],
-) -> NDArray[Shape["*, *"], UInt32]:
-    # front faces of the voxel
-    # each face is made of 2 triangles and each triangle is made of 3 vertices so 2 * 3 * 3 = 18
-    # 5 here is (x, y, z, voxel_id, face_id)
-    vertex = np.empty(CHUNK_VOLUME * 18 * format_size, dtype=np.uint32)
+    world_voxels: VoxelArrays,
+    vertex: NDArray[Shape["*"], UInt32],
+    y0: int,
+    y1: int,
+) -> NDArray[Shape["*"], UInt32]:
+    mode = world_voxels.modes[chunk_idx]
+    neighbours = get_neighbours(position, world_voxels.positions)
+    if mode == 0 or (mode > 0 and is_enclosed(world_voxels, neighbours)):
+        return np.empty(0, dtype=np.uint32)
+    # faces of the voxels in rows y0 to y1, y counts rows from y0 on below
+    padded = get_padded_voxels(world_voxels, neighbours, y0, y1, 1)
+    occupancy = get_occupancy(padded)
     idx = 0
     for x in range(CHUNK_SIZE):
-        for y in range(CHUNK_SIZE):
-            for z in range(CHUNK_SIZE):
-                voxel_id = chunk_voxels[x + CHUNK_SIZE * z + CHUNK_AREA * y]
-                if voxel_id:
-                    cx, cy, cz = position
-                    wx = cx * CHUNK_SIZE + x
-                    wy = cy * CHUNK_SIZE + y
-                    wz = cz * CHUNK_SIZE + z
-                    # top face
-                    if is_voxel_visible((x, y + 1, z), (wx, wy + 1, wz), world_voxels):
-                        ao = ambient_occlusion((x, y + 1, z), (wx, wy + 1, wz), world_voxels, "Y")
-                        flip = ao[0] + ao[2] < ao[1] + ao[3]
-                        v0 = pack(x, y + 1, z, voxel_id, 0, ao[0], flip)
-                        v1 = pack(x + 1, y + 1, z, voxel_id, 0, ao[1], flip)
-                        v2 = pack(x + 1, y + 1, z + 1, voxel_id, 0, ao[2], flip)
-                        v3 = pack(x, y + 1, z + 1, voxel_id, 0, ao[3], flip)
-                        vs = (v1, v0, v3, v1, v3, v2) if flip else (v0, v3, v2, v0, v2, v1)
-                        idx = add_data(vertex, idx, *vs)
-                    # bottom face
-                    if is_voxel_visible((x, y - 1, z), (wx, wy - 1, wz), world_voxels):
-                        ao = ambient_occlusion((x, y - 1, z), (wx, wy - 1, wz), world_voxels, "Y")
-                        flip = ao[0] + ao[2] < ao[1] + ao[3]
-                        v0 = pack(x, y, z, voxel_id, 1, ao[0], flip)
-                        v1 = pack(x + 1, y, z, voxel_id, 1, ao[1], flip)
-                        v2 = pack(x + 1, y, z + 1, voxel_id, 1, ao[2], flip)
-                        v3 = pack(x, y, z + 1, voxel_id, 1, ao[3], flip)
-                        vs = (v1, v3, v0, v1, v2, v3) if flip else (v0, v2, v3, v0, v1, v2)
-                        idx = add_data(vertex, idx, *vs)
-                    # right face
-                    if is_voxel_visible((x + 1, y, z), (wx + 1, wy, wz), world_voxels):
-                        ao = ambient_occlusion((x + 1, y, z), (wx + 1, wy, wz), world_voxels, "X")
-                        flip = ao[0] + ao[2] < ao[1] + ao[3]
-                        v0 = pack(x + 1, y, z, voxel_id, 2, ao[0], flip)
-                        v1 = pack(x + 1, y + 1, z, voxel_id, 2, ao[1], flip)
-                        v2 = pack(x + 1, y + 1, z + 1, voxel_id, 2, ao[2], flip)
-                        v3 = pack(x + 1, y, z + 1, voxel_id, 2, ao[3], flip)
-                        vs = (v3, v0, v1, v3, v1, v2) if flip else (v0, v1, v2, v0, v2, v3)
-                        idx = add_data(vertex, idx, *vs)
-                    # left face
-                    if is_voxel_visible((x - 1, y, z), (wx - 1, wy, wz), world_voxels):
-                        ao = ambient_occlusion((x - 1, y, z), (wx - 1, wy, wz), world_voxels, "X")
-                        flip = ao[0] + ao[2] < ao[1] + ao[3]
-                        v0 = pack(x, y, z, voxel_id, 3, ao[0], flip)
-                        v1 = pack(x, y + 1, z, voxel_id, 3, ao[1], flip)
-                        v2 = pack(x, y + 1, z + 1, voxel_id, 3, ao[2], flip)
-                        v3 = pack(x, y, z + 1, voxel_id, 3, ao[3], flip)
-                        vs = (v3, v1, v0, v3, v2, v1) if flip else (v0, v2, v1, v0, v3, v2)
-                        idx = add_data(vertex, idx, *vs)
-                    # back face
-                    if is_voxel_visible((x, y, z - 1), (wx, wy, wz - 1), world_voxels):
-                        ao = ambient_occlusion((x, y, z - 1), (wx, wy, wz - 1), world_voxels, "Z")
-                        flip = ao[0] + ao[2] < ao[1] + ao[3]
-                        v0 = pack(x, y, z, voxel_id, 4, ao[0], flip)
-                        v1 = pack(x, y + 1, z, voxel_id, 4, ao[1], flip)
-                        v2 = pack(x + 1, y + 1, z, voxel_id, 4, ao[2], flip)
-                        v3 = pack(x + 1, y, z, voxel_id, 4, ao[3], flip)
-                        vs = (v3, v0, v1, v3, v1, v2) if flip else (v0, v1, v2, v0, v2, v3)
-                        idx = add_data(vertex, idx, *vs)
-                    # front face
-                    if is_voxel_visible((x, y, z + 1), (wx, wy, wz + 1), world_voxels):
-                        ao = ambient_occlusion((x, y, z + 1), (wx, wy, wz + 1), world_voxels, "Z")
-                        flip = ao[0] + ao[2] < ao[1] + ao[3]
-                        v0 = pack(x, y, z + 1, voxel_id, 5, ao[0], flip)
-                        v1 = pack(x, y + 1, z + 1, voxel_id, 5, ao[1], flip)
-                        v2 = pack(x + 1, y + 1, z + 1, voxel_id, 5, ao[2], flip)
-                        v3 = pack(x + 1, y, z + 1, voxel_id, 5, ao[3], flip)
-                        vs = (v3, v1, v0, v3, v2, v1) if flip else (v0, v2, v1, v0, v3, v2)
-                        idx = add_data(vertex, idx, *vs)
-
-    return vertex[: idx + 1]
+        for y in range(y1 - y0):
+            masks = get_face_masks(occupancy, x, y, INNER_BITS)
+            exposed = (masks[0] | masks[1] | masks[2] | masks[3] | masks[4] | masks[5]) >> 1
+            z = 0
+            # only voxels with a visible face are looked at
+            while exposed:
+                if exposed & 1:
+                    voxel_id = padded[x + 1, y + 1, z + 1]
+                    for face_id in range(6):
+                        if not (masks[face_id] >> (z + 1)) & 1:
+                            continue
+                        dx, dy, dz = FACE_NORMALS[face_id]
+                        key = get_face_key(voxel_id, face_id, (x + dx, y + dy, z + dz), occupancy)
+                        wy = y0 + y
+                        n, a, b = (wy, x, z) if face_id < 2 else (x, wy, z) if face_id < 4 else (z, x, wy)
+                        idx = add_quad(vertex, idx, face_id, n, a, b, 1, 1, key)
+                exposed >>= 1
+                z += 1
+
+    # the scratch buffer is reused for the next chunk
+    return vertex[:idx].copy()
+
+
+@njit(cache=True)  # type: ignore
+def build_greedy_mesh(
+    padded: NDArray[Shape["*, *, *"], UInt8],
+    occupancy: NDArray[Shape["*, *"], Int64],
+    vertex: NDArray[Shape["*"], UInt32],
+    y0: int,
+    scale: int,
+) -> NDArray[Shape["*"], UInt32]:
+    # greedy quads of a padded block of voxels size wide and deep, its rows start at row y0 of the chunk
+    size, rows = padded.shape[0] - 2, padded.shape[1] - 2
+    area = size * size
+    inner = ((1 << size) - 1) << 1
+    # every visible face keyed by voxel_id and ao, 0 where there is none
+    faces = np.zeros((6, area * rows), dtype=np.uint16)
+    # faces left in every slice, so the merge pass skips empty slices and the empty tail of the others
+    counts = np.zeros((6, max(size, rows)), dtype=np.int64)
+    for x in range(size):
+        for y in range(rows):
+            masks = get_face_masks(occupancy, x, y, inner)
+            for face_id in range(6):
+                visible = masks[face_id] >> 1
+                dx, dy, dz = FACE_NORMALS[face_id]
+                z = 0
+                while visible:
+                    if visible & 1:
+                        v_idx = x + size * z + area * y
+                        local_pos = (x + dx, y + dy, z + dz)
+                        faces[face_id, v_idx] = get_face_key(padded[x + 1, y + 1, z + 1], face_id, local_pos, occupancy)
+                        counts[face_id, y if face_id < 2 else x if face_id < 4 else z] += 1
+                    visible >>= 1
+                    z += 1
+
+    idx = 0
+    extents = (size, rows, size)
+    strides = (1, area, size)
+    for face_id in range(6):
+        normal_axis, a_axis, b_axis = FACE_AXES[face_id]
+        n_stride, a_stride, b_stride = strides[normal_axis], strides[a_axis], strides[b_axis]
+        a_size, b_size = extents[a_axis], extents[b_axis]
+        face_keys = faces[face_id]
+        for n in range(extents[normal_axis]):
+            for b in range(b_size):
+                if not counts[face_id, n]:
+                    break
+                for a in range(a_size):
+                    start = n * n_stride + a * a_stride + b * b_stride
+                    key = face_keys[start]
+                    if not key:
+                        continue
+                    # faces only merge along an axis their ao does not change along, the merged quad then
+                    # interpolates ao exactly like its unit faces did
+                    ao0, ao1, ao2, ao3 = (key >> 6) & 3, (key >> 4) & 3, (key >> 2) & 3, key & 3
+                    along_v1, along_v3 = ao0 == ao1 and ao3 == ao2, ao0 == ao3 and ao1 == ao2
+                    along_a, along_b = (along_v1, along_v3) if face_id < 4 else (along_v3, along_v1)
+                    w = h = 1
+                    if along_a:
+                        while a + w < a_size and face_keys[start + w * a_stride] == key:
+                            w += 1
+                    if along_b:
+                        while b + h < b_size:
+                            row = start + h * b_stride
+                            matches = True
+                            for i in range(w):
+                                if face_keys[row + i * a_stride] != key:
+                                    matches = False
+                                    break
+                            if not matches:
+                                break
+                            h += 1
+                    for j in range(h):
+                        for i in range(w):
+                            face_keys[start + j * b_stride + i * a_stride] = 0
+                    counts[face_id, n] -= w * h
+                    # back to chunk coordinates
+                    wn = n + y0 if normal_axis == 1 else n
+                    wa = a + y0 if a_axis == 1 else a
+                    wb = b + y0 if b_axis == 1 else b
+                    idx = add_quad(vertex, idx, face_id, wn, wa, wb, w, h, key, scale)
+
+    # the scratch buffer is reused for the next chunk
+    return vertex[:idx].copy()
+
+
+@njit(nogil=True, cache=True)  # type: ignore
+def build_greedy_chunk_mesh(
+    chunk_idx: int,
+    position: tuple[int, int, int],
+    world_voxels: VoxelArrays,
+    vertex: NDArray[Shape["*"], UInt32],
+    y0: int,
+    y1: int,
+) -> NDArray[Shape["*"], UInt32]:
+    mode = world_voxels.modes[chunk_idx]
+    neighbours = get_neighbours(position, world_voxels.positions)
+    if mode == 0 or (mode > 0 and is_enclosed(world_voxels, neighbours)):
+        return np.empty(0, dtype=np.uint32)
+    # faces of the voxels in rows y0 to y1, y counts rows from y0 on below
+    padded = get_padded_voxels(world_voxels, neighbours, y0, y1, 1)
+    return np.asarray(build_greedy_mesh(padded, get_occupancy(padded), vertex, y0, 1))
+
+
+@njit(inline="always", cache=True)  # type: ignore
+def get_cell(fine: NDArray[Shape["*, *, *"], UInt8], x0: int, y0: int, z0: int, scale: int, border: bool) -> int:
+    # id of the highest voxel of a cell, a border cell only counts as solid if all of its voxels are
+    for y in range(y0 + scale - 1, y0 - 1, -1):
+        for z in range(z0, z0 + scale):
+            for x in range(x0, x0 + scale):
+                if fine[x, y, z]:
+                    if not border:
+                        return fine[x, y, z]  # type: ignore
+                elif border:
+                    return 0
+    return fine[x0, y0, z0]  # type: ignore
+
+
+@njit(cache=True)  # type: ignore
+def downsample(fine: NDArray[Shape["*, *, *"], UInt8], scale: int) -> NDArray[Shape["*, *, *"], UInt8]:
+    # cells of scale^3 voxels of a chunk padded by scale voxels, a cell of the chunk is solid if any of its voxels
+    # is so the coarse surface never sinks below the full one, a border cell only hides the faces next to it if it
+    # is solid throughout, so a coarse chunk keeps every face a finer neighbour may leave open and levels of detail
+    # meet without cracks
+    size = fine.shape[0] // scale
+    coarse = np.empty((size, size, size), dtype=np.uint8)
+    for cx in range(size):
+        for cz in range(size):
+            for cy in range(size):
+                border = cx == 0 or cy == 0 or cz == 0 or cx == size - 1 or cy == size - 1 or cz == size - 1
+                coarse[cx, cy, cz] = get_cell(fine, cx * scale, cy * scale, cz * scale, scale, border)
+    return coarse
+
+
+@njit(nogil=True, cache=True)  # type: ignore
+def build_lod_chunk_mesh(
+    chunk_idx: int,
+    position: tuple[int, int, int],
+    world_voxels: VoxelArrays,
+    vertex: NDArray[Shape["*"], UInt32],
+    scale: int,
+) -> NDArray[Shape["*"], UInt32]:
+    # the whole chunk greedy meshed from voxels scale times the size of its own
+    mode = world_voxels.modes[chunk_idx]
+    neighbours = get_neighbours(position, world_voxels.positions)
+    if mode == 0 or (mode > 0 and is_enclosed(world_voxels, neighbours)):
+        return np.empty(0, dtype=np.uint32)
+    coarse = downsample(get_padded_voxels(world_voxels, neighbours, 0, CHUNK_SIZE, scale), scale)
+    return np.asarray(build_greedy_mesh(coarse, get_occupancy(coarse), vertex, 0, scale))
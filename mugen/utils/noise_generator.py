@@ -1,23 +1,26 @@
 import math
-import random
+import typing as t
 
 import numba
-from nptyping import NDArray, Shape, UInt8
+import numpy as np
+from nptyping import Int32, Int64, NDArray, Shape, UInt8
 from opensimplex.internals import _init, _noise2, _noise3
 
 from .constants import CHUNK, WORLD
 
 __all__: tuple[str, ...] = (
+    "NoiseSeed",
     "noise2",
     "noise3",
     "height_map",
+    "column_height_map",
+    "random_hash",
+    "random_float",
+    "random_int",
     "set_voxel_id",
 )
 
 
-perm, perm_grad_index3 = _init(seed=WORLD.SEED)
-
-
 CENTER_XZ = numba.int32(WORLD.CENTER_XZ)
 CENTER_Y = numba.int32(WORLD.CENTER_Y)
 HEIGHT_FREQ = numba.float32(0.005)
@@ -42,19 +45,52 @@ TREE_PROBABILITY = 0.004
 TREE_WIDTH, TREE_HEIGHT = 4, 8
 TREE_H_WIDTH, TREE_H_HEIGHT = TREE_WIDTH // 2, TREE_HEIGHT // 2
 
+# counter based rng, every draw is a pure function of (seed, voxel position, stream)
+GOLDEN_GAMMA = numba.uint64(0x9E3779B97F4A7C15)
+MIX_1 = numba.uint64(0xBF58476D1CE4E5B9)
+MIX_2 = numba.uint64(0x94D049BB133111EB)
+PRIME_X = numba.uint64(0x8CB92BA72F3D8DD7)
+PRIME_Y = numba.uint64(0xD6E8FEB86659FD93)
+PRIME_Z = numba.uint64(0xA0761D6478BD642F)
+SHIFT_30, SHIFT_27, SHIFT_31 = numba.uint64(30), numba.uint64(27), numba.uint64(31)
+SHIFT_11 = numba.uint64(11)
+INV_2_53 = 1.0 / (1 << 53)
 
-@numba.njit(cache=True)  # type: ignore
-def noise2(x: float, y: float) -> float:
-    return float(_noise2(x, y, perm))
+# random streams drawn per voxel
+CAVE_STREAM = 0
+LAYER_STREAM = 1
+TREE_STREAM = 2
+LEAVES_STREAM = 3
 
+# inlined so the permutation tables do not have to be passed through a call once per voxel
+_noise3_inline = numba.njit(inline="always", cache=True)(_noise3.py_func)
+
+
+class NoiseSeed(t.NamedTuple):
+    # seed dependent state is handed to the kernels instead of being baked into them as globals,
+    # so the compiled kernels stay valid for every world
+    perm: NDArray[Shape["256"], Int64]
+    perm_grad_index3: NDArray[Shape["256"], Int64]
+    key: np.uint64
+
+    @classmethod
+    def from_seed(cls, seed: int) -> "NoiseSeed":
+        perm, perm_grad_index3 = _init(seed=seed)
+        return cls(perm, perm_grad_index3, np.uint64(seed & 0xFFFFFFFFFFFFFFFF))
 
-@numba.njit(cache=True)  # type: ignore
-def noise3(x: float, y: float, z: float) -> float:
-    return float(_noise3(x, y, z, perm, perm_grad_index3))
 
+@numba.njit(inline="always", cache=True)  # type: ignore
+def noise2(x: float, y: float, seed: NoiseSeed) -> float:
+    return float(_noise2(x, y, seed.perm))
 
-@numba.njit  # type: ignore
-def height_map(x: float, z: float) -> int:
+
+@numba.njit(inline="always", cache=True)  # type: ignore
+def noise3(x: float, y: float, z: float, seed: NoiseSeed) -> float:
+    return float(_noise3_inline(x, y, z, seed.perm, seed.perm_grad_index3))
+
+
+@numba.njit(cache=True)  # type: ignore
+def height_map(x: float, z: float, seed: NoiseSeed) -> int:
     # island mask
     island = 1 / (pow(0.0025 * math.hypot(x - CENTER_XZ, z - CENTER_XZ), 20) + 0.0001)
     island = min(island, 1)
@@ -67,38 +103,76 @@ def height_map(x: float, z: float) -> int:
     f1 = HEIGHT_FREQ * 1.5
     f2, f4, f8 = f1 * 2, f1 * 4, f1 * 8
 
-    if noise2(0.1 * x, 0.1 * z) < 0:
+    if noise2(0.1 * x, 0.1 * z, seed) < 0:
         a1 /= 1.03
 
-    height = noise2(x * f1, z * f1) * a1 + a1
-    height += noise2(x * f2, z * f2) * a2 - a2
-    height += noise2(x * f4, z * f4) * a4 + a4
-    height += noise2(x * f8, z * f8) * a8 - a8
-    height = max(height, noise2(x * f8, z * f8) + 2)
+    height = noise2(x * f1, z * f1, seed) * a1 + a1
+    height += noise2(x * f2, z * f2, seed) * a2 - a2
+    height += noise2(x * f4, z * f4, seed) * a4 + a4
+    n8 = noise2(x * f8, z * f8, seed)
+    height += n8 * a8 - a8
+    height = max(height, n8 + 2)
     return int(height * island)
 
 
-@numba.njit  # type: ignore
+@numba.njit(nogil=True, cache=True)  # type: ignore
+def column_height_map(heights: NDArray[Shape["*, *"], Int32], cx: int, cz: int, seed: NoiseSeed) -> None:
+    # heights of every (x, z) column of a chunk column, shared by all chunks stacked in it
+    for x in range(CHUNK_SIZE):
+        for z in range(CHUNK_SIZE):
+            heights[x, z] = height_map(x + cx, z + cz, seed)
+
+
+@numba.njit(inline="always", cache=True)  # type: ignore
+def mix64(h: int) -> int:
+    # splitmix64 finalizer
+    h = (h ^ (h >> SHIFT_30)) * MIX_1
+    h = (h ^ (h >> SHIFT_27)) * MIX_2
+    return h ^ (h >> SHIFT_31)  # type: ignore
+
+
+@numba.njit(inline="always", cache=True)  # type: ignore
+def random_hash(x: int, y: int, z: int, stream: int, seed: NoiseSeed) -> int:
+    h = seed.key + numba.uint64(stream) * GOLDEN_GAMMA
+    h = mix64(h ^ numba.uint64(x) * PRIME_X)
+    h = mix64(h ^ numba.uint64(y) * PRIME_Y)
+    return mix64(h ^ numba.uint64(z) * PRIME_Z)  # type: ignore
+
+
+@numba.njit(inline="always", cache=True)  # type: ignore
+def random_float(x: int, y: int, z: int, stream: int, seed: NoiseSeed) -> float:
+    # uniform in [0, 1)
+    return float(random_hash(x, y, z, stream, seed) >> SHIFT_11) * INV_2_53
+
+
+@numba.njit(inline="always", cache=True)  # type: ignore
+def random_int(x: int, y: int, z: int, stream: int, low: int, high: int, seed: NoiseSeed) -> int:
+    # uniform in [low, high], like random.randint
+    return low + int(random_float(x, y, z, stream, seed) * (high - low + 1))
+
+
+@numba.njit(cache=True)  # type: ignore
 def get_index(x: int, y: int, z: int) -> int:
     return int(x + CHUNK_SIZE * z + CHUNK_AREA * y)
 
 
-@numba.njit  # type: ignore
+@numba.njit(inline="always", cache=True)  # type: ignore
 def set_voxel_id(
     voxels: NDArray[Shape["*, *"], UInt8],
     local_pos: tuple[int, int, int],
     world_pos: tuple[int, int, int],
     world_height: int,
+    seed: NoiseSeed,
 ) -> None:
     x, y, z = local_pos
     wx, wy, wz = world_pos
-    if wy < world_height - random.randint(3, 6):
+    if wy < world_height - random_int(wx, wy, wz, CAVE_STREAM, 3, 6, seed):
         # create caves
-        is_cave = noise3(wx * 0.09, wy * 0.09, wz * 0.09) > 0
-        voxel_id = 0 if is_cave and noise2(wx * 0.1, wz * 0.1) * 3 + 3 < wy < world_height - 10 else STONE
+        is_cave = noise3(wx * 0.09, wy * 0.09, wz * 0.09, seed) > 0
+        voxel_id = 0 if is_cave and noise2(wx * 0.1, wz * 0.1, seed) * 3 + 3 < wy < world_height - 10 else STONE
     else:
         # block level rng
-        rng = int(random.random() * 7)
+        rng = int(random_float(wx, wy, wz, LAYER_STREAM, seed) * 7)
         ry = wy - rng
         if SNOW_LVL <= ry < world_height:
             voxel_id = SNOW
@@ -113,13 +187,20 @@ def set_voxel_id(
     voxels[get_index(x, y, z)] = voxel_id
     # place tree
     if wy < DIRT_LVL:
-        place_tree(voxels, x, y, z, voxel_id)
+        place_tree(voxels, local_pos, world_pos, voxel_id, seed)
 
 
-@numba.njit  # type: ignore
-def place_tree(voxels: NDArray[Shape["*, *"], UInt8], x: int, y: int, z: int, voxel_id: int) -> None:
-    rnd = random.random()
-    if voxel_id != GRASS or rnd > TREE_PROBABILITY:
+@numba.njit(inline="always", cache=True)  # type: ignore
+def place_tree(
+    voxels: NDArray[Shape["*, *"], UInt8],
+    local_pos: tuple[int, int, int],
+    world_pos: tuple[int, int, int],
+    voxel_id: int,
+    seed: NoiseSeed,
+) -> None:
+    x, y, z = local_pos
+    wx, wy, wz = world_pos
+    if voxel_id != GRASS or random_float(wx, wy, wz, TREE_STREAM, seed) > TREE_PROBABILITY:
         return None
     if y + TREE_HEIGHT >= CHUNK_SIZE:
         return None
@@ -134,7 +215,7 @@ def place_tree(voxels: NDArray[Shape["*, *"], UInt8], x: int, y: int, z: int, vo
     m = 0
     for n, iy in enumerate(range(TREE_H_HEIGHT, TREE_HEIGHT - 1)):
         k = iy % 2
-        rng = int(random.random() * 2)
+        rng = int(random_float(wx, wy, wz, LEAVES_STREAM + n, seed) * 2)
         for ix in range(-TREE_H_WIDTH + m, TREE_H_WIDTH - m * rng):
             for iz in range(-TREE_H_WIDTH + m * rng, TREE_H_WIDTH - m):
                 if (ix + iz) % 4:
@@ -0,0 +1,104 @@
+import numpy as np
+from nptyping import Bool, Int32, Int64, NDArray, Shape
+from numba import int64, njit
+
+from .mesh_builder import CHUNK_AREA, CHUNK_SIZE, CHUNK_VOLUME, FACE_NORMALS, get_chunk_idx
+from .storage import DENSE, VoxelArrays, decode_voxels
+
+__all__: tuple[str, ...] = (
+    "ALL_FACES",
+    "get_face_connectivity",
+    "get_reachable",
+)
+
+
+# bit 6 * a + b is set when air connects face a of a chunk to face b, faces in mesh order
+ALL_FACES = int64((1 << 36) - 1)
+
+
+@njit(nogil=True, cache=True)  # type: ignore
+def get_face_connectivity(chunk_idx: int, world_voxels: VoxelArrays) -> int:
+    mode = world_voxels.modes[chunk_idx]
+    if mode >= 0:
+        return int(ALL_FACES) if mode == 0 else 0
+    if mode == DENSE:
+        voxels = world_voxels.voxels[chunk_idx]
+    else:
+        voxels = np.empty(CHUNK_VOLUME, dtype=np.uint8)
+        decode_voxels(world_voxels, chunk_idx, voxels)
+    visited = np.zeros(CHUNK_VOLUME, dtype=np.uint8)
+    stack = np.empty(CHUNK_VOLUME, dtype=np.int32)
+    last = CHUNK_SIZE - 1
+    connectivity = 0
+    for seed in range(CHUNK_VOLUME):
+        if voxels[seed] or visited[seed]:
+            continue
+        # flood fill the air around the seed, noting the faces of the chunk it reaches
+        visited[seed] = 1
+        stack[0] = seed
+        size = 1
+        faces = 0
+        while size:
+            size -= 1
+            i = stack[size]
+            x, z, y = i % CHUNK_SIZE, (i // CHUNK_SIZE) % CHUNK_SIZE, i // CHUNK_AREA
+            faces |= int(y == last) | int(y == 0) << 1 | int(x == last) << 2 | int(x == 0) << 3
+            faces |= int(z == 0) << 4 | int(z == last) << 5
+            for face in range(6):
+                dx, dy, dz = FACE_NORMALS[face]
+                nx, ny, nz = x + dx, y + dy, z + dz
+                if not (0 <= nx <= last and 0 <= ny <= last and 0 <= nz <= last):
+                    continue
+                j = nx + CHUNK_SIZE * nz + CHUNK_AREA * ny
+                if not voxels[j] and not visited[j]:
+                    visited[j] = 1
+                    stack[size] = j
+                    size += 1
+        for a in range(6):
+            if faces >> a & 1:
+                for b in range(6):
+                    if faces >> b & 1:
+                        connectivity |= 1 << (6 * a + b)
+    return connectivity
+
+
+@njit(cache=True)  # type: ignore
+def get_reachable(
+    start: int,
+    positions: NDArray[Shape["*, 3"], Int32],
+    connectivity: NDArray[Shape["*"], Int64],
+    on_frustum: NDArray[Shape["*"], Bool],
+) -> NDArray[Shape["*"], Bool]:
+    # chunks the camera in the start chunk can see into through air, a breadth first search that only enters chunks
+    # on the frustum, only leaves a chunk through a face air connects to the one it came in by and never steps
+    # against a direction it already took
+    reached = np.zeros(len(positions), dtype=np.bool_)
+    queue = np.empty(len(positions), dtype=np.int64)
+    entered = np.empty(len(positions), dtype=np.int64)
+    directions = np.empty(len(positions), dtype=np.int64)
+    reached[start] = True
+    queue[0] = start
+    entered[start] = -1
+    directions[start] = 0
+    head, tail = 0, 1
+    while head < tail:
+        idx = queue[head]
+        head += 1
+        x, y, z = positions[idx, 0], positions[idx, 1], positions[idx, 2]
+        for face in range(6):
+            # faces come in opposite pairs
+            if directions[idx] >> (face ^ 1) & 1:
+                continue
+            if entered[idx] >= 0 and not connectivity[idx] >> (6 * entered[idx] + face) & 1:
+                continue
+            dx, dy, dz = FACE_NORMALS[face]
+            position = ((x + dx) * CHUNK_SIZE, (y + dy) * CHUNK_SIZE, (z + dz) * CHUNK_SIZE)
+            neighbour = get_chunk_idx(position, positions)
+            if neighbour < 0 or reached[neighbour] or not on_frustum[neighbour]:
+                continue
+            reached[neighbour] = True
+            entered[neighbour] = face ^ 1
+            directions[neighbour] = directions[idx] | (1 << face)
+            queue[tail] = neighbour
+            tail += 1
+    return reached
@@ -0,0 +1,183 @@
+import collections
+import mmap
+import pathlib
+import threading
+import zlib
+
+import numpy as np
+from nptyping import NDArray, Shape, UInt8
+
+from .constants import CHUNK, WORLD
+
+__all__: tuple[str, ...] = ("RegionStore",)
+
+
+# region file layout
+#   preamble: magic (4 bytes), version (u4), slot count (u4), reserved (u4)
+#   offset table: one `ENTRY` per chunk slot of the region
+#   payloads: compressed chunk voxels, appended or rewritten in place
+MAGIC = b"MGRN"
+VERSION = 1
+PREAMBLE = np.dtype([("magic", "S4"), ("version", "<u4"), ("slots", "<u4"), ("reserved", "<u4")])
+ENTRY = np.dtype(
+    [
+        ("offset", "<u8"),
+        ("length", "<u4"),
+        ("capacity", "<u4"),
+        ("codec", "u1"),
+        ("value", "u1"),
+        ("reserved", "V6"),
+    ]
+)
+
+REGION_SIZE = WORLD.REGION_SIZE
+REGION_VOLUME = REGION_SIZE**3
+TABLE_OFFSET = PREAMBLE.itemsize
+DATA_OFFSET = TABLE_OFFSET + ENTRY.itemsize * REGION_VOLUME
+
+# codecs
+MISSING = 0
+ZLIB = 1
+UNIFORM = 2
+
+
+class RegionFile:
+    def __init__(self, path: pathlib.Path) -> None:
+        self.path = path
+        if not path.exists():
+            preamble = np.array([(MAGIC, VERSION, REGION_VOLUME, 0)], dtype=PREAMBLE)
+            path.write_bytes(preamble.tobytes() + np.zeros(REGION_VOLUME, dtype=ENTRY).tobytes())
+        self._file = path.open("r+b")
+        self._mmap: mmap.mmap | None = None
+        preamble = np.frombuffer(self._file.read(PREAMBLE.itemsize), dtype=PREAMBLE)[0]
+        if preamble["magic"] != MAGIC or preamble["version"] != VERSION or preamble["slots"] != REGION_VOLUME:
+            raise ValueError(f"'{path}' is not a version {VERSION} region file with {REGION_VOLUME} slots!")
+        self.table = np.frombuffer(self._file.read(ENTRY.itemsize * REGION_VOLUME), dtype=ENTRY).copy()
+
+    def __contains__(self, slot: int) -> bool:
+        return bool(self.table[slot]["codec"] != MISSING)
+
+    def read(self, slot: int) -> tuple[int, int, bytes]:
+        entry = self.table[slot]
+        if entry["codec"] != ZLIB:
+            return int(entry["codec"]), int(entry["value"]), b""
+        if self._mmap is None:
+            self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        offset = int(entry["offset"])
+        return ZLIB, 0, self._mmap[offset : offset + int(entry["length"])]
+
+    def write(self, slot: int, codec: int, value: int = 0, payload: bytes = b"") -> None:
+        entry = self.table[slot]
+        if len(payload) > entry["capacity"]:
+            # payload outgrew its slot, move it to the end of the file
+            entry["offset"] = max(self._file.seek(0, 2), DATA_OFFSET)
+            entry["capacity"] = len(payload)
+        if payload:
+            self._file.seek(int(entry["offset"]))
+            self._file.write(payload)
+        entry["length"] = len(payload)
+        entry["codec"] = codec
+        entry["value"] = value
+        self._file.seek(TABLE_OFFSET + slot * ENTRY.itemsize)
+        self._file.write(self.table[slot : slot + 1].tobytes())
+        self._unmap()
+
+    def flush(self) -> None:
+        self._file.flush()
+
+    def close(self) -> None:
+        self._unmap()
+        self._file.close()
+
+    def _unmap(self) -> None:
+        if self._mmap is not None:
+            self._file.flush()
+            self._mmap.close()
+            self._mmap = None
+
+
+class RegionStore:
+    def __init__(
+        self,
+        directory: pathlib.Path,
+        seed: int | None = None,
+        compression: int = 1,
+        max_open: int = WORLD.OPEN_REGIONS,
+    ) -> None:
+        self.directory = directory
+        self.compression = compression
+        self.max_open = max_open
+        self.directory.mkdir(parents=True, exist_ok=True)
+        # a saved world keeps the seed it was generated with, new ones take the given seed or a random one
+        seed_file = self.directory / "seed"
+        if not seed_file.exists():
+            self.seed = WORLD.SEED if seed is None else seed
+            seed_file.write_text(str(self.seed))
+        else:
+            self.seed = int(seed_file.read_text())
+            if seed is not None and seed != self.seed:
+                raise ValueError(f"Region store at '{directory}' belongs to a world with a different seed!")
+        self._regions: collections.OrderedDict[tuple[int, int, int], RegionFile] = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+    def __contains__(self, position: tuple[int, int, int]) -> bool:
+        with self._lock:
+            region = self._get_region(position, create=False)
+            return region is not None and self._get_slot(position) in region
+
+    def load(self, position: tuple[int, int, int], voxels: NDArray[Shape["*"], UInt8]) -> bool:
+        with self._lock:
+            region = self._get_region(position, create=False)
+            if region is None:
+                return False
+            codec, value, payload = region.read(self._get_slot(position))
+        if codec == MISSING:
+            return False
+        if codec == UNIFORM:
+            voxels[:] = value
+        else:
+            voxels[:] = np.frombuffer(zlib.decompress(payload, bufsize=CHUNK.VOLUME), dtype=np.uint8)
+        return True
+
+    def save(self, position: tuple[int, int, int], voxels: NDArray[Shape["*"], UInt8]) -> None:
+        value = int(voxels[0])
+        if not np.any(voxels != value):
+            codec, payload = UNIFORM, b""
+        else:
+            codec, value, payload = ZLIB, 0, zlib.compress(voxels.tobytes(), self.compression)
+        with self._lock:
+            region = self._get_region(position, create=True)
+            assert region is not None
+            region.write(self._get_slot(position), codec, value, payload)
+
+    def flush(self) -> None:
+        with self._lock:
+            for region in self._regions.values():
+                region.flush()
+
+    def close(self) -> None:
+        with self._lock:
+            for region in self._regions.values():
+                region.close()
+            self._regions.clear()
+
+    def _get_region(self, position: tuple[int, int, int], create: bool) -> RegionFile | None:
+        x, y, z = position
+        key = rx, ry, rz = x // REGION_SIZE, y // REGION_SIZE, z // REGION_SIZE
+        if key in self._regions:
+            self._regions.move_to_end(key)
+            return self._regions[key]
+        path = self.directory / f"r.{rx}.{ry}.{rz}.mgr"
+        if not create and not path.exists():
+            return None
+        self._regions[key] = RegionFile(path)
+        if len(self._regions) > self.max_open:
+            # close the region used least recently, closing flushes its pending writes
+            self._regions.popitem(last=False)[1].close()
+        return self._regions[key]
+
+    @staticmethod
+    def _get_slot(position: tuple[int, int, int]) -> int:
+        x, y, z = position
+        x, y, z = x % REGION_SIZE, y % REGION_SIZE, z % REGION_SIZE
+        return x + REGION_SIZE * z + REGION_SIZE * REGION_SIZE * y
@@ -0,0 +1,171 @@
+import mmap
+import pathlib
+import tempfile
+import typing as t
+
+import numpy as np
+from nptyping import Int16, Int32, NDArray, Shape, UInt8
+from numba import int64, njit
+
+from .constants import CHUNK
+
+__all__: tuple[str, ...] = (
+    "VoxelArrays",
+    "VoxelStorage",
+    "get_voxel",
+    "decode_voxels",
+    "DENSE",
+    "PALETTE",
+)
+
+
+# storage modes, any non-negative mode is the voxel id filling a single material chunk
+DENSE = -1
+PALETTE = -2
+PALETTE_SIZE = 16
+
+CHUNK_VOLUME = int64(CHUNK.VOLUME)
+# position of slots not holding any chunk, no chunk ever lives this far out
+UNASSIGNED = np.iinfo(np.int32).min
+
+
+class VoxelArrays(t.NamedTuple):
+    # dense voxels of chunks in DENSE mode, rows of other chunks are released back to the os
+    voxels: NDArray[Shape["*, *"], UInt8]
+    modes: NDArray[Shape["*"], Int16]
+    palettes: NDArray[Shape["*, *"], UInt8]
+    # two 4 bit palette indices per byte
+    packed: NDArray[Shape["*, *"], UInt8]
+    # chunk position held by each slot of the ring buffered chunk map
+    positions: NDArray[Shape["*, 3"], Int32]
+
+
+@njit(cache=True)  # type: ignore
+def get_voxel(arrays: VoxelArrays, chunk_idx: int, voxel_idx: int) -> int:
+    mode = arrays.modes[chunk_idx]
+    if mode >= 0:
+        return int(mode)
+    if mode == DENSE:
+        return int(arrays.voxels[chunk_idx, voxel_idx])
+    index = (arrays.packed[chunk_idx, voxel_idx >> 1] >> ((voxel_idx & 1) << 2)) & 0xF
+    return int(arrays.palettes[chunk_idx, index])
+
+
+@njit(nogil=True, cache=True)  # type: ignore
+def compact_voxels(arrays: VoxelArrays, chunk_idx: int) -> int:
+    voxels = arrays.voxels[chunk_idx]
+    palette = arrays.palettes[chunk_idx]
+    lookup = np.full(256, -1, dtype=np.int16)
+    size = 0
+    for i in range(CHUNK_VOLUME):
+        voxel_id = voxels[i]
+        if lookup[voxel_id] < 0:
+            if size == PALETTE_SIZE:
+                return DENSE
+            lookup[voxel_id] = size
+            palette[size] = voxel_id
+            size += 1
+    if size == 1:
+        arrays.modes[chunk_idx] = voxels[0]
+        return int(voxels[0])
+    packed = arrays.packed[chunk_idx]
+    for i in range(0, CHUNK_VOLUME, 2):
+        packed[i >> 1] = lookup[voxels[i]] | (lookup[voxels[i + 1]] << 4)
+    arrays.modes[chunk_idx] = PALETTE
+    return PALETTE
+
+
+@njit(nogil=True, cache=True)  # type: ignore
+def decode_voxels(arrays: VoxelArrays, chunk_idx: int, out: NDArray[Shape["*"], UInt8]) -> None:
+    for i in range(CHUNK_VOLUME):
+        out[i] = get_voxel(arrays, chunk_idx, i)
+
+
+class VoxelStorage:
+    def __init__(self, volume: int, memmap_dir: pathlib.Path | None = None) -> None:
+        size = volume * CHUNK.VOLUME
+        self._files: list[t.IO[bytes]] = []
+        self._voxel_map = self._map(size, memmap_dir)
+        self._packed_map = self._map(size // 2, memmap_dir)
+        self.arrays = VoxelArrays(
+            voxels=np.frombuffer(self._voxel_map, dtype=np.uint8).reshape(volume, CHUNK.VOLUME),
+            # chunks read as air until they are built
+            modes=np.zeros(volume, dtype=np.int16),
+            palettes=np.zeros((volume, PALETTE_SIZE), dtype=np.uint8),
+            packed=np.frombuffer(self._packed_map, dtype=np.uint8).reshape(volume, CHUNK.VOLUME // 2),
+            positions=np.full((volume, 3), UNASSIGNED, dtype=np.int32),
+        )
+
+    def _map(self, size: int, directory: pathlib.Path | None) -> mmap.mmap:
+        if directory is None:
+            return mmap.mmap(-1, size)
+        # file backed voxels let the os page cold chunks out instead of keeping the whole world resident,
+        # the scratch files are unlinked on creation and the region store stays the persistent copy
+        file = tempfile.TemporaryFile(prefix="voxels-", dir=directory)
+        file.truncate(size)
+        self._files.append(file)
+        return mmap.mmap(file.fileno(), size)
+
+    def assign(self, chunk_idx: int, position: tuple[int, int, int]) -> None:
+        self.arrays.positions[chunk_idx] = position
+
+    def allocate(self, chunk_idx: int) -> NDArray[Shape["*"], UInt8]:
+        # dense row for the caller to overwrite entirely
+        self.arrays.modes[chunk_idx] = DENSE
+        return t.cast(NDArray[Shape["*"], UInt8], self.arrays.voxels[chunk_idx])
+
+    def materialize(self, chunk_idx: int) -> NDArray[Shape["*"], UInt8]:
+        voxels: NDArray[Shape["*"], UInt8] = self.arrays.voxels[chunk_idx]
+        if self.arrays.modes[chunk_idx] != DENSE:
+            decode_voxels(self.arrays, chunk_idx, voxels)
+            self.arrays.modes[chunk_idx] = DENSE
+            self._release(self._packed_map, chunk_idx * CHUNK.VOLUME // 2, CHUNK.VOLUME // 2)
+        return voxels
+
+    def compact(self, chunk_idx: int) -> int:
+        mode = compact_voxels(self.arrays, chunk_idx)
+        if mode != DENSE:
+            self._release(self._voxel_map, chunk_idx * CHUNK.VOLUME, CHUNK.VOLUME)
+        return int(mode)
+
+    def release(self, chunk_idx: int) -> None:
+        # the slot reads as missing until another chunk is assigned to it
+        self.arrays.positions[chunk_idx] = UNASSIGNED
+        self.arrays.modes[chunk_idx] = 0
+        self._release(self._voxel_map, chunk_idx * CHUNK.VOLUME, CHUNK.VOLUME)
+        self._release(self._packed_map, chunk_idx * CHUNK.VOLUME // 2, CHUNK.VOLUME // 2)
+
+    def decode(self, chunk_idx: int) -> NDArray[Shape["*"], UInt8]:
+        voxels = np.empty(CHUNK.VOLUME, dtype=np.uint8)
+        decode_voxels(self.arrays, chunk_idx, voxels)
+        return voxels
+
+    def get(self, chunk_idx: int, voxel_idx: int) -> int:
+        mode = int(self.arrays.modes[chunk_idx])
+        if mode >= 0:
+            return mode
+        if mode == DENSE:
+            return int(self.arrays.voxels[chunk_idx, voxel_idx])
+        index = (int(self.arrays.packed[chunk_idx, voxel_idx >> 1]) >> ((voxel_idx & 1) << 2)) & 0xF
+        return int(self.arrays.palettes[chunk_idx, index])
+
+    def is_empty(self, chunk_idx: int) -> bool:
+        return bool(self.arrays.modes[chunk_idx] == 0)
+
+    @property
+    def nbytes(self) -> int:
+        # bytes held by voxel data of every storage mode
+        modes = self.arrays.modes
+        dense = np.count_nonzero(modes == DENSE) * CHUNK.VOLUME
+        palette = np.count_nonzero(modes == PALETTE) * (CHUNK.VOLUME // 2 + PALETTE_SIZE)
+        return int(dense + palette + modes.nbytes)
+
+    @staticmethod
+    def _release(buffer: mmap.mmap, offset: int, length: int) -> None:
+        # drop the whole pages of a row, their contents are never read again before being overwritten
+        if not hasattr(mmap, "MADV_DONTNEED"):
+            return
+        start = -(-offset // mmap.PAGESIZE) * mmap.PAGESIZE
+        end = (offset + length) // mmap.PAGESIZE * mmap.PAGESIZE
+        if end > start:
+            buffer.madvise(mmap.MADV_DONTNEED, start, end - start)
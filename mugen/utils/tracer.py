@@ -0,0 +1,159 @@
+import contextlib
+import json
+import mmap
+import os
+import pathlib
+import threading
+import time
+import typing as t
+
+from numba.core import event
+
+__all__: tuple[str, ...] = (
+    "Span",
+    "Tracer",
+    "resident",
+    "tracer",
+)
+
+
+def resident() -> int:
+    # resident set size of this process, linux only
+    try:
+        pages = int(pathlib.Path("/proc/self/statm").read_text().split()[1])
+    except OSError:
+        return 0
+    return pages * mmap.PAGESIZE
+
+
+class Span(t.NamedTuple):
+    name: str
+    start: float
+    end: float
+    # change of the resident set size over the span, unknown for spans recorded after the fact
+    rss: int | None
+    thread: str
+    depth: int
+
+    @property
+    def duration(self) -> float:
+        return self.end - self.start
+
+
+class CompileListener(event.Listener):  # type: ignore[misc]
+    # kernels compiled by numba, cache loads do not fire the event and numba's own overloads are folded into
+    # the kernel that needed them
+    def __init__(self, tracer: "Tracer") -> None:
+        self.tracer = tracer
+
+    @staticmethod
+    def is_traced(e: event.Event) -> bool:
+        return not e.data["dispatcher"].py_func.__module__.startswith("numba.")
+
+    def on_start(self, e: event.Event) -> None:
+        if self.is_traced(e):
+            self.tracer.begin(f"jit {e.data['dispatcher'].py_func.__qualname__}")
+
+    def on_end(self, e: event.Event) -> None:
+        if self.is_traced(e):
+            self.tracer.end()
+
+
+class Tracer:
+    def __init__(self) -> None:
+        self.enabled = False
+        self.path: pathlib.Path | None = None
+        self.origin = time.perf_counter()
+        self.spans: list[Span] = []
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._listener = CompileListener(self)
+
+    @property
+    def _stack(self) -> list[tuple[str, float, int]]:
+        if not hasattr(self._local, "stack"):
+            self._local.stack = []
+        return self._local.stack  # type: ignore
+
+    def start(self, path: pathlib.Path | None = None, origin: float | None = None) -> None:
+        self.enabled = True
+        self.path = path
+        self.origin = time.perf_counter() if origin is None else origin
+        self.spans.clear()
+        event.register("numba:compile", self._listener)
+
+    def stop(self) -> str:
+        # writes the trace if a path was given and returns the report
+        if not self.enabled:
+            return ""
+        self.enabled = False
+        event.unregister("numba:compile", self._listener)
+        if self.path is not None:
+            self.save(self.path)
+        return self.report()
+
+    def begin(self, name: str) -> None:
+        if self.enabled:
+            self._stack.append((name, time.perf_counter(), resident()))
+
+    def end(self) -> None:
+        # spans begun before the tracer was started or stopped are dropped
+        if self._stack:
+            name, start, rss = self._stack.pop()
+            self.record(name, start, time.perf_counter(), resident() - rss)
+
+    @contextlib.contextmanager
+    def span(self, name: str) -> t.Iterator[None]:
+        self.begin(name)
+        try:
+            yield
+        finally:
+            self.end()
+
+    def record(self, name: str, start: float, end: float, rss: int | None = None) -> None:
+        if not self.enabled:
+            return
+        span = Span(name, start, end, rss, threading.current_thread().name, len(self._stack))
+        with self._lock:
+            self.spans.append(span)
+
+    def report(self) -> str:
+        end = max((span.end for span in self.spans), default=self.origin)
+        lines = [f"{end - self.origin:.3f}s traced", f"{'start ms':>9} {'wall ms':>9} {'rss MiB':>8}  span"]
+        threads = dict.fromkeys(span.thread for span in sorted(self.spans, key=lambda s: s.start))
+        for thread in threads:
+            if len(threads) > 1:
+                lines.append(f"[{thread}]")
+            for span in sorted((s for s in self.spans if s.thread == thread), key=lambda s: (s.start, -s.end)):
+                rss = "" if span.rss is None else f"{span.rss / 2**20:+.1f}"
+                lines.append(
+                    f"{(span.start - self.origin) * 1000:>9.1f} {span.duration * 1000:>9.1f} {rss:>8}  "
+                    f"{'  ' * span.depth}{span.name}"
+                )
+        return "\n".join(lines)
+
+    def save(self, path: pathlib.Path) -> None:
+        # chrome://tracing and perfetto read complete events, timestamps in microseconds
+        pid = os.getpid()
+        threads = {thread: i for i, thread in enumerate(dict.fromkeys(span.thread for span in self.spans))}
+        events: list[dict[str, t.Any]] = [
+            {"name": "thread_name", "ph": "M", "pid": pid, "tid": tid, "args": {"name": thread}}
+            for thread, tid in threads.items()
+        ]
+        for span in self.spans:
+            events.append(
+                {
+                    "name": span.name,
+                    "ph": "X",
+                    "ts": (span.start - self.origin) * 1e6,
+                    "dur": span.duration * 1e6,
+                    "pid": pid,
+                    "tid": threads[span.thread],
+                    "args": {} if span.rss is None else {"rss_delta_mib": round(span.rss / 2**20, 3)},
+                }
+            )
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps({"traceEvents": events, "displayTimeUnit": "ms"}))
+
+
+tracer = Tracer()